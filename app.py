@@ -1,8 +1,24 @@
+import argparse
 import pygame
 import sys
-import random
+import threading
+import time
 import logging
-from typing import List, Tuple
+from collections import deque
+from typing import Deque, List, NamedTuple, Optional, Tuple
+
+from frame_budget import FrameBudget
+from frame_capture import FORMATS, FrameCapture
+from frame_metrics import LatencyTracker
+from snake_autopilot import Autopilot
+from snake_engine import DOWN, LEFT, RIGHT, UP, SnakeEngine, SnakeState
+from snake_hamilton import HamiltonianSolver
+from snake_mcts import MctsBot
+from snake_pixels import MAX_PIXEL_CELL_SIZE, PixelRenderer
+from snake_render import HudText, SnakeRenderer
+from snake_replay import ReplayRecorder
+from snake_view import Camera
+from triple_buffer import TripleBuffer
 
 # Configure logging
 logging.basicConfig(
@@ -11,229 +27,570 @@ logging.basicConfig(
     handlers=[logging.StreamHandler(sys.stdout)],
 )
 
+HUD_COLOR = (255, 255, 255)
+INVINCIBLE_COLOR = (255, 255, 0)
+DEBUG_COLOR = (200, 200, 200)
+
+KEY_DIRECTIONS = {
+    pygame.K_UP: UP,
+    pygame.K_DOWN: DOWN,
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT,
+}
+
+# Keys toggling the bots, by SnakeGame attribute name
+BOT_KEYS = {
+    pygame.K_a: "autopilot",
+    pygame.K_h: "solver",
+    pygame.K_m: "mcts",
+}
+BOT_LABELS = {"autopilot": "Autopilot", "solver": "Solver", "mcts": "MCTS"}
+
+# Turns buffered ahead of the logic ticks; one is applied per tick
+MAX_QUEUED_TURNS = 3
+
+# Logic ticks allowed to catch up in one frame before the backlog is dropped
+MAX_TICKS_PER_FRAME = 5
+
+# Largest board for threaded mode: it publishes a full snapshot() every
+# tick, about 0.7 ms at this size and growing with the cell count
+MAX_THREADED_CELLS = 250_000
+
+
+class TickFrame(NamedTuple):
+    """What the logic thread hands the render thread after each tick."""
+
+    state: SnakeState
+    prev_head: Tuple[int, int]
+    prev_tail: Tuple[int, int]
+    time: float  # time.perf_counter() when the tick finished
+    tick_ms: float
+
 
 class SnakeGame:
-    def __init__(self, width: int = 800, height: int = 600, cell_size: int = 20):
+    """Pygame frontend: input and rendering over a headless SnakeEngine."""
+
+    def __init__(
+        self,
+        width: int = 800,
+        height: int = 600,
+        cell_size: int = 20,
+        seed: Optional[int] = None,
+        replay_path: Optional[str] = None,
+        fps: int = 60,
+        latency_csv: Optional[str] = None,
+        board_size: Optional[Tuple[int, int]] = None,
+        capture_path: Optional[str] = None,
+        capture_format: Optional[str] = None,
+        capture_command: Optional[str] = None,
+        threaded: bool = False,
+        adaptive: bool = True,
+        autopilot: bool = False,
+        plan_budget_ms: float = 2.0,
+        solver: bool = False,
+        mcts: bool = False,
+    ):
         self.width = width
         self.height = height
         self.cell_size = cell_size
-
-        # Game state variables
-        self.score = 0
-        self.high_score = 0
-        self.level = 1
-        self.speed = 10  # base speed
-        self.invincible = False
-        self.power_up_timer = 0  # in milliseconds
-        self.power_ups: List[Tuple[int, int, str]] = []
+        self.fps = fps  # render rate; logic runs at engine.tick_rate
+
+        # Game rules and state live in the engine. By default the board fills
+        # the window; a larger board_size (cols, rows) scrolls with the head.
+        cols, rows = board_size or (width // cell_size, height // cell_size)
+        if threaded and cols * rows > MAX_THREADED_CELLS:
+            raise ValueError(
+                f"Board {cols}x{rows} is too large for threaded mode "
+                f"(at most {MAX_THREADED_CELLS} cells)"
+            )
+        self.engine = SnakeEngine(cols, rows, seed)
+        # The engine the display reads. With threaded=True the engine is
+        # stepped on a logic thread and the display draws a private copy
+        # restored from the snapshots it publishes.
+        self.threaded = threaded
+        self.view = self.engine
+        if threaded:
+            self.view = SnakeEngine(cols, rows, self.engine.seed)
+        self.camera = Camera(width, height, cell_size, cols, rows)
+        # (direction, keydown time) pairs waiting for a logic tick; bot
+        # turns carry no keydown time
+        self.direction_queue: Deque[Tuple[Tuple[int, int], Optional[float]]] = deque()
+        self.quit_requested = False
+        self.replay_path = replay_path
+        self.recorder = ReplayRecorder(self.engine) if replay_path else None
+        # Head and tail cells before the last tick, for interpolated drawing
+        self.prev_head = self.engine.snake[0]
+        self.prev_tail = self.engine.snake[-1]
+
+        # Bots are built on first use: their tables grow with the board
+        self.plan_budget_ms = plan_budget_ms
+        self._autopilot: Optional[Autopilot] = None
+        self._solver: Optional[HamiltonianSolver] = None
+        self._mcts: Optional[MctsBot] = None
+        # A* bot steering whenever no turn is queued; toggled with A
+        self.autopilot_on = autopilot
+        # Hamiltonian-cycle solver feeding turns in like the keyboard;
+        # toggled with H. The autopilot is its detour.
+        self.solver_on = solver
+        # Monte Carlo tree search bot, fed in the same way; toggled with M
+        self.mcts_on = mcts
+        # Bot toggles from the keyboard, applied by update() so that in
+        # threaded mode a bot is never reset while the logic thread runs it
+        self.bot_toggles: Deque[str] = deque()
+
+        # Debug overlay (F3) and keypress-to-screen latency
+        self.show_debug = False
+        self.latency = LatencyTracker()
+        self.latency_csv = latency_csv
+
+        # Quality tiers stepped down when frames overrun their budget
+        self.budget = FrameBudget(fps) if adaptive else None
+        self._hud: Optional[List[HudText]] = None
+        self._hud_time = 0.0
 
         # Initialize pygame
         pygame.init()
-        self.screen = pygame.display.set_mode((self.width, self.height))
+        self.screen = pygame.display.set_mode(
+            (self.width, self.height), pygame.RESIZABLE
+        )
         pygame.display.set_caption("Snake Game")
         self.clock = pygame.time.Clock()
-
-        # Game objects
-        self.snake: List[Tuple[int, int]] = [(10, 10), (9, 10), (8, 10)]
-        self.direction = (1, 0)  # moving right initially
-        self.obstacles: List[Tuple[int, int]] = []
-        self.food: Tuple[int, int] = self.generate_food()
-        self.game_over = False
-
-        # Generate initial obstacles
-        self.generate_obstacles()
-        logging.info("Game initialized.")
-
-    def generate_food(self) -> Tuple[int, int]:
-        """Generate a new food position not colliding with snake or obstacles."""
-        while True:
-            x = random.randint(0, (self.width // self.cell_size) - 1)
-            y = random.randint(0, (self.height // self.cell_size) - 1)
-            if (x, y) not in self.snake and (x, y) not in self.obstacles:
-                return (x, y)
-
-    def generate_obstacles(self):
-        """Generate obstacles avoiding snake and food."""
-        max_obstacles = 20
-        while len(self.obstacles) < max_obstacles:
-            x = random.randint(0, (self.width // self.cell_size) - 1)
-            y = random.randint(0, (self.height // self.cell_size) - 1)
-            if (
-                (x, y) not in self.snake
-                and (x, y) not in self.obstacles
-                and (x, y) != self.food
-            ):
-                self.obstacles.append((x, y))
-
-    def generate_power_up(self):
-        """Occasionally generate a power‑up."""
-        if random.random() < 0.01:  # 1% chance each frame
-            x = random.randint(0, (self.width // self.cell_size) - 1)
-            y = random.randint(0, (self.height // self.cell_size) - 1)
-            if (
-                (x, y) not in self.snake
-                and (x, y) not in self.obstacles
-                and (x, y) != self.food
-                and (x, y, "invincibility") not in self.power_ups
-            ):
-                self.power_ups.append((x, y, "invincibility"))
-                logging.info(f"Power‑up generated at {(x, y)}")
+        # Tiny cells on huge boards are drawn as one scaled pixel array
+        if cell_size <= MAX_PIXEL_CELL_SIZE:
+            renderer = PixelRenderer
+        else:
+            renderer = SnakeRenderer
+        self.renderer = renderer(self.screen, self.view, self.camera, cell_size)
+
+        # Presented frames are recorded on a background thread
+        self.capture = None
+        if capture_path:
+            self.capture = FrameCapture(
+                capture_path,
+                (width, height),
+                capture_format,
+                fps,
+                command=capture_command,
+            )
+        logging.info(f"Game initialized (seed {self.engine.seed}).")
+
+    @property
+    def autopilot(self) -> Autopilot:
+        if self._autopilot is None:
+            self._autopilot = Autopilot(self.engine, self.plan_budget_ms)
+        return self._autopilot
+
+    @property
+    def solver(self) -> HamiltonianSolver:
+        if self._solver is None:
+            self._solver = HamiltonianSolver(self.engine, self.autopilot)
+        return self._solver
+
+    @property
+    def mcts(self) -> MctsBot:
+        if self._mcts is None:
+            self._mcts = MctsBot(self.engine, self.plan_budget_ms)
+        return self._mcts
+
+    @property
+    def game_over(self) -> bool:
+        return self.quit_requested or self.engine.game_over
 
     def handle_input(self):
-        """Process user input to change direction or quit."""
+        """Process user input to queue direction changes or quit."""
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                self.game_over = True
+                self.quit_requested = True
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP and self.direction != (0, 1):
-                    self.direction = (0, -1)
-                elif event.key == pygame.K_DOWN and self.direction != (0, -1):
-                    self.direction = (0, 1)
-                elif event.key == pygame.K_LEFT and self.direction != (1, 0):
-                    self.direction = (-1, 0)
-                elif event.key == pygame.K_RIGHT and self.direction != (-1, 0):
-                    self.direction = (1, 0)
-
-    def update(self):
-        """Update game state: move snake, handle collisions, power‑ups."""
-        # Move snake
-        head_x, head_y = self.snake[0]
-        dx, dy = self.direction
-        new_head = (head_x + dx, head_y + dy)
-
-        # Check wall collision
-        if not (0 <= new_head[0] < self.width // self.cell_size) or not (
-            0 <= new_head[1] < self.height // self.cell_size
-        ):
-            self.game_over = True
-            return
-
-        # Check self collision
-        if new_head in self.snake and not self.invincible:
-            self.game_over = True
-            return
-
-        # Check obstacle collision
-        if new_head in self.obstacles and not self.invincible:
-            self.game_over = True
+                if event.key in KEY_DIRECTIONS:
+                    self.queue_direction(KEY_DIRECTIONS[event.key])
+                elif event.key in BOT_KEYS:
+                    self.bot_toggles.append(BOT_KEYS[event.key])
+                elif event.key == pygame.K_F3:
+                    self.show_debug = not self.show_debug
+                    self._hud = None
+            elif event.type == pygame.VIDEORESIZE:
+                self.resize(event.w, event.h)
+            elif event.type == pygame.WINDOWEXPOSED:
+                self.renderer.invalidate()
+
+    def resize(self, width: int, height: int):
+        """Follow a window resize; the next frame is a full repaint."""
+        self.width = width
+        self.height = height
+        self.screen = pygame.display.get_surface()
+        self.renderer.screen = self.screen
+        engine = self.engine
+        self.camera = Camera(width, height, self.cell_size, engine.cols, engine.rows)
+        self.renderer.camera = self.camera
+        self.renderer.invalidate()
+
+    def toggle_bot(self, name: str):
+        """Switch a bot on or off, starting it with a fresh plan."""
+        # Build the bot before its flag can be seen on the render thread
+        getattr(self, name).reset()
+        on = not getattr(self, f"{name}_on")
+        setattr(self, f"{name}_on", on)
+        logging.info(f"{BOT_LABELS[name]} {'on' if on else 'off'}")
+
+    def queue_direction(self, direction: Tuple[int, int], track: bool = True):
+        """Buffer a turn so quick successive turns each get their own tick.
+
+        Turns that repeat or reverse the previously queued heading could
+        never take effect and are dropped, as are turns beyond the queue
+        bound. ``track=False`` keeps bot turns out of the input latency.
+        """
+        if self.direction_queue:
+            last = self.direction_queue[-1][0]
+        else:
+            last = self.engine.direction
+        if direction == last or direction == (-last[0], -last[1]):
             return
+        if len(self.direction_queue) < MAX_QUEUED_TURNS:
+            pressed = self.latency.now() if track else None
+            self.direction_queue.append((direction, pressed))
 
-        # Add new head
-        self.snake.insert(0, new_head)
-
-        # Check food collision
-        if new_head == self.food:
-            self.score += 10
-            if self.score > self.high_score:
-                self.high_score = self.score
-            self.food = self.generate_food()
-            # Increase level every 50 points
-            if self.score % 50 == 0:
-                self.level += 1
+    def update(self):
+        """Advance the engine one tick, applying at most one queued turn.
+
+        With the solver or the MCTS bot on, its turn is queued like a
+        keypress when no turn is waiting; otherwise the autopilot, if on,
+        picks the heading. Bot planning is bounded by the per-tick budget.
+        The invincibility timer runs on tick time rather than frame time so
+        that a recorded game replays exactly.
+        """
+        while self.bot_toggles:
+            self.toggle_bot(self.bot_toggles.popleft())
+        if not self.direction_queue:
+            if self.solver_on:
+                self.queue_direction(self.solver.next_direction(), track=False)
+            elif self.mcts_on:
+                self.queue_direction(self.mcts.next_direction(), track=False)
+        direction = None
+        if self.direction_queue:
+            direction, pressed = self.direction_queue.popleft()
+            if pressed is not None:
+                self.latency.consumed(pressed)
+        elif self.autopilot_on:
+            direction = self.autopilot.next_direction()
+        self.prev_head = self.engine.snake[0]
+        self.prev_tail = self.engine.snake[-1]
+        self.engine.step(direction)
+        if self.recorder:
+            self.recorder.record_tick()
+
+    def snapshot(self) -> SnakeState:
+        """Immutable copy of the game state for look-ahead bots."""
+        return self.engine.snapshot()
+
+    def restore(self, state: SnakeState):
+        """Return the game to a snapshot and drop any queued input."""
+        self.engine.restore(state)
+        self.direction_queue.clear()
+        for bot in (self._autopilot, self._solver, self._mcts):
+            if bot is not None:
+                bot.reset()
+        self.prev_head = self.engine.snake[0]
+        self.prev_tail = self.engine.snake[-1]
+
+    def draw(self, alpha: float = 1.0, frame: Optional[TickFrame] = None):
+        """Render the part of the board inside the window, then the HUD.
+
+        ``alpha`` is how far (0-1) the display is between the previous logic
+        tick and the current one; the head and the vacated tail cell are
+        drawn interpolated by it and the camera follows the head. Only the
+        cells and HUD text that changed since the last frame are repainted.
+        In threaded mode ``frame`` is the tick the view was restored from.
+        """
+        engine = self.view
+        if self.budget and not self.budget.tier.interpolate:
+            alpha = 1.0
+        if frame is None:
+            prev_head, prev_tail, through = self.prev_head, self.prev_tail, None
         else:
-            # Remove tail
-            self.snake.pop()
-
-        # Check power‑up collision
-        for pu in self.power_ups:
-            if new_head == (pu[0], pu[1]):
-                if pu[2] == "invincibility":
-                    self.invincible = True
-                    self.power_up_timer = 5000  # 5 seconds
-                self.power_ups.remove(pu)
-                break
-
-        # Update power‑up timer
-        if self.invincible:
-            self.power_up_timer -= self.clock.get_time()
-            if self.power_up_timer <= 0:
-                self.invincible = False
-                self.power_up_timer = 0
-
-        # Generate new power‑up occasionally
-        self.generate_power_up()
-
-    def draw(self):
-        """Render all game elements."""
-        self.screen.fill((0, 0, 0))
-
-        # Draw food
-        food_rect = pygame.Rect(
-            self.food[0] * self.cell_size,
-            self.food[1] * self.cell_size,
-            self.cell_size,
-            self.cell_size,
+            prev_head, prev_tail, through = frame.prev_head, frame.prev_tail, frame.time
+        head = engine.snake[0]
+        head_pos = (
+            prev_head[0] + (head[0] - prev_head[0]) * alpha,
+            prev_head[1] + (head[1] - prev_head[1]) * alpha,
         )
-        pygame.draw.rect(self.screen, (255, 0, 0), food_rect)
-
-        # Draw obstacles
-        for obs in self.obstacles:
-            obs_rect = pygame.Rect(
-                obs[0] * self.cell_size,
-                obs[1] * self.cell_size,
-                self.cell_size,
-                self.cell_size,
-            )
-            pygame.draw.rect(self.screen, (100, 100, 100), obs_rect)
-
-        # Draw power‑ups
-        for pu in self.power_ups:
-            pu_rect = pygame.Rect(
-                pu[0] * self.cell_size,
-                pu[1] * self.cell_size,
-                self.cell_size,
-                self.cell_size,
-            )
-            pygame.draw.rect(self.screen, (0, 255, 255), pu_rect)
-
-        # Draw snake
-        for segment in self.snake:
-            seg_rect = pygame.Rect(
-                segment[0] * self.cell_size,
-                segment[1] * self.cell_size,
-                self.cell_size,
-                self.cell_size,
-            )
-            pygame.draw.rect(self.screen, (0, 255, 0), seg_rect)
-
-        # Draw score
-        font = pygame.font.SysFont(None, 36)
-        score_surf = font.render(f"Score: {self.score}", True, (255, 255, 255))
-        self.screen.blit(score_surf, (10, 10))
-
-        # Draw level
-        level_surf = font.render(f"Level: {self.level}", True, (255, 255, 255))
-        self.screen.blit(level_surf, (10, 50))
-
-        # Draw invincibility timer
-        if self.invincible:
-            timer_surf = font.render(
-                f"Invincible: {self.power_up_timer // 1000 + 1}s", True, (255, 255, 0)
+        tail = engine.snake[-1]
+        tail_pos = None
+        if alpha < 1.0 and tail != prev_tail:
+            tail_pos = (
+                prev_tail[0] + (tail[0] - prev_tail[0]) * alpha,
+                prev_tail[1] + (tail[1] - prev_tail[1]) * alpha,
             )
-            self.screen.blit(timer_surf, (10, 90))
 
-        pygame.display.flip()
+        self.renderer.draw(head_pos, tail_pos, self.current_hud())
+        self.latency.presented(through)
+        if self.capture:
+            self.capture.capture(self.screen)
+
+    def current_hud(self) -> List[HudText]:
+        """HUD items, rebuilt at most every hud_interval_ms of the tier."""
+        now = time.perf_counter()
+        interval = self.budget.tier.hud_interval_ms if self.budget else 0
+        if self._hud is None or (now - self._hud_time) * 1000 >= interval:
+            self._hud = self.hud_items()
+            self._hud_time = now
+        return self._hud
+
+    def track_frame(self, update_ms: float, draw_ms: float):
+        """Feed the frame budget and apply any change of quality tier."""
+        if self.budget and self.budget.record(update_ms, draw_ms):
+            tier = self.budget.tier
+            self.fps = self.budget.fps
+            self.renderer.set_cell_borders(tier.cell_borders)
+            self._hud = None
+
+    def hud_items(self) -> List[HudText]:
+        """Score, level, invincibility timer and, with F3, the debug overlay."""
+        engine = self.view
+        hud = [
+            HudText(f"Score: {engine.score}", HUD_COLOR, (10, 10)),
+            HudText(f"Level: {engine.level}", HUD_COLOR, (10, 50)),
+        ]
+        if engine.invincible:
+            seconds = engine.power_up_timer // 1000 + 1
+            hud.append(HudText(f"Invincible: {seconds}s", INVINCIBLE_COLOR, (10, 90)))
+        if self.show_debug:
+            hud.extend(self.debug_overlay())
+        return hud
+
+    def debug_overlay(self) -> List[HudText]:
+        """Frame rate and input latency percentiles, toggled with F3."""
+        lines = [
+            f"fps {self.clock.get_fps():.0f}  tick rate {self.view.tick_rate}/s",
+            self.latency.summary(),
+            self.renderer.text_cache.summary(),
+        ]
+        # Bots are only ever built on the logic thread; skip unbuilt ones
+        autopilot, solver, mcts = self._autopilot, self._solver, self._mcts
+        if autopilot and (self.autopilot_on or self.solver_on):
+            lines.append(autopilot.summary())
+        if solver and self.solver_on:
+            lines.append(solver.summary())
+        if mcts and self.mcts_on:
+            lines.append(mcts.summary())
+        if self.budget:
+            lines.append(self.budget.summary())
+        if self.capture:
+            lines.append(self.capture.summary())
+        if self.threaded:
+            frames = self.frames
+            lines.append(f"ticks published {frames.published}, shown {frames.read}")
+        return [
+            HudText(line, DEBUG_COLOR, (self.width - 10, 10 + i * 22), 24, True)
+            for i, line in enumerate(lines)
+        ]
 
     def run(self):
-        """Main game loop."""
+        """Main game loop, then the game-over screen."""
+        if self.threaded:
+            self.run_threaded()
+        else:
+            self.run_single()
+        self.finish()
+
+    def run_single(self):
+        """Fixed-timestep accumulator on one thread.
+
+        Input is polled and the screen drawn at ``fps``, while the engine
+        advances at its level's tick rate with any direction input queued
+        to the next tick.
+        """
+        previous = time.perf_counter()
+        accumulator = 0.0  # in milliseconds
         while not self.game_over:
+            now = time.perf_counter()
+            accumulator += (now - previous) * 1000
+            previous = now
+
             self.handle_input()
-            self.update()
-            self.draw()
+
             # Speed increases with level
-            self.clock.tick(self.speed + (self.level - 1) * 2)
+            start = time.perf_counter()
+            tick_ms = 1000 / self.engine.tick_rate
+            ticks = 0
+            while accumulator >= tick_ms and not self.game_over:
+                self.update()
+                accumulator -= tick_ms
+                ticks += 1
+                if ticks == MAX_TICKS_PER_FRAME:
+                    accumulator = 0.0
+                    break
+                tick_ms = 1000 / self.engine.tick_rate
+
+            drawn = time.perf_counter()
+            self.draw(min(accumulator / tick_ms, 1.0))
+            end = time.perf_counter()
+            self.track_frame((drawn - start) * 1000, (end - drawn) * 1000)
+            self.clock.tick(self.fps)
+
+    def run_threaded(self):
+        """Logic on a worker thread, input and drawing on this one.
+
+        pygame needs the window and its events on the main thread, so the
+        simulation moves instead: it ticks on its own schedule and
+        publishes a TickFrame through a triple buffer after every tick. A
+        slow frame (font rasterization, a window drag) delays only the
+        display, never the next tick.
+        """
+        self.frames = TripleBuffer(self._tick_frame(1000 / self.engine.tick_rate))
+        self._stop_logic = threading.Event()
+        logic = threading.Thread(target=self._logic_loop, name="snake-logic")
+        logic.start()
+        shown = None
+        try:
+            while True:
+                self.handle_input()
+                frame = self.frames.latest()
+                if frame is not shown:
+                    self.view.restore(frame.state)
+                    shown = frame
+                if self.quit_requested or frame.state.game_over or not logic.is_alive():
+                    break
+                start = time.perf_counter()
+                elapsed = (start - frame.time) * 1000
+                self.draw(min(elapsed / frame.tick_ms, 1.0), frame)
+                # Ticks run on the logic thread and cost this one nothing
+                self.track_frame(0.0, (time.perf_counter() - start) * 1000)
+                self.clock.tick(self.fps)
+        finally:
+            self._stop_logic.set()
+            logic.join()
+        # Show the final state, including a last tick published while exiting
+        self.view.restore(self.frames.latest().state)
+
+    def _tick_frame(self, tick_ms: float) -> TickFrame:
+        return TickFrame(
+            self.engine.snapshot(),
+            self.prev_head,
+            self.prev_tail,
+            time.perf_counter(),
+            tick_ms,
+        )
 
-        # Game over screen
-        font = pygame.font.SysFont(None, 72)
-        over_surf = font.render("Game Over", True, (255, 0, 0))
+    def _logic_loop(self):
+        """Tick the engine at its level's rate until the game ends."""
+        next_tick = time.perf_counter()
+        while not self.game_over:
+            tick_ms = 1000 / self.engine.tick_rate
+            next_tick += tick_ms / 1000
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                if self._stop_logic.wait(delay):
+                    break
+            elif -delay * 1000 > tick_ms * MAX_TICKS_PER_FRAME:
+                # Too far behind to catch up; drop the backlog
+                next_tick = time.perf_counter()
+            if self.quit_requested or self._stop_logic.is_set():
+                break
+            self.update()
+            self.frames.publish(self._tick_frame(tick_ms))
+
+    def finish(self):
+        """Save recordings and show the game-over screen."""
+        if self.recorder:
+            self.recorder.finish().save(self.replay_path)
+            logging.info(f"Replay saved to {self.replay_path}")
+        if self.latency_csv:
+            self.latency.write_csv(self.latency_csv)
+            logging.info(f"{self.latency.summary()}, written to {self.latency_csv}")
+
+        # Game over screen, on top of a full repaint of the final board
+        self.renderer.invalidate()
+        self.draw()
+        over_surf = self.renderer.render_text("Game Over", (255, 0, 0), 72)
         over_rect = over_surf.get_rect(center=(self.width // 2, self.height // 2))
         self.screen.blit(over_surf, over_rect)
         pygame.display.flip()
+        if self.capture:
+            self.capture.capture(self.screen)
+            self.capture.close()
         pygame.time.wait(2000)
         pygame.quit()
         sys.exit()
 
 
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Snake game")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--board",
+        default=None,
+        help="board size as COLSxROWS; larger than the window scrolls",
+    )
+    parser.add_argument(
+        "--cell-size",
+        type=int,
+        default=20,
+        help=f"pixels per cell; {MAX_PIXEL_CELL_SIZE} or less uses the pixel renderer",
+    )
+    parser.add_argument("--replay", default=None, help="record a replay file")
+    parser.add_argument("--latency-csv", default=None)
+    parser.add_argument(
+        "--threaded",
+        action="store_true",
+        help=f"run the game logic on its own thread (boards up to "
+        f"{MAX_THREADED_CELLS} cells)",
+    )
+    parser.add_argument(
+        "--autopilot", action="store_true", help="let the A* bot play (toggle: A)"
+    )
+    parser.add_argument(
+        "--plan-budget-ms",
+        type=float,
+        default=2.0,
+        help="autopilot and MCTS planning time per tick",
+    )
+    parser.add_argument(
+        "--solver",
+        action="store_true",
+        help="let the Hamiltonian-cycle solver play (toggle: H)",
+    )
+    parser.add_argument(
+        "--mcts",
+        action="store_true",
+        help="let the Monte Carlo tree search bot play (toggle: M)",
+    )
+    parser.add_argument(
+        "--fixed-quality",
+        action="store_true",
+        help="keep full rendering quality even when frames overrun",
+    )
+    parser.add_argument(
+        "--capture",
+        default=None,
+        help="record frames: a .rgb/.raw file, a PNG directory, or a video file",
+    )
+    parser.add_argument("--capture-format", choices=FORMATS, default=None)
+    parser.add_argument(
+        "--capture-cmd",
+        default=None,
+        help="encoder command reading RGB24 frames on stdin (ffmpeg format)",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    game = SnakeGame()
+    args = parse_args()
+    board = tuple(int(n) for n in args.board.lower().split("x")) if args.board else None
+    game = SnakeGame(
+        cell_size=args.cell_size,
+        seed=args.seed,
+        replay_path=args.replay,
+        latency_csv=args.latency_csv,
+        board_size=board,
+        capture_path=args.capture,
+        capture_format=args.capture_format,
+        capture_command=args.capture_cmd,
+        threaded=args.threaded,
+        adaptive=not args.fixed_quality,
+        autopilot=args.autopilot,
+        plan_budget_ms=args.plan_budget_ms,
+        solver=args.solver,
+        mcts=args.mcts,
+    )
     game.run()
\ No newline at end of file
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for SnakeBatch.
+
+Steps batches of random-playing boards (turning on about 10% of ticks)
+and reports board-ticks per second for each batch size.
+
+    python bench_batch.py
+"""
+
+import time
+
+import numpy as np
+
+from snake_batch import SnakeBatch
+
+STEPS = 300
+
+
+def main():
+    policy = np.random.default_rng(1)
+    for n in (1, 64, 1024, 4096):
+        batch = SnakeBatch(n, 40, 30, seed=0)
+        start = time.perf_counter()
+        for _ in range(STEPS):
+            turn = policy.random(n) < 0.1
+            batch.step(np.where(turn, policy.integers(0, 4, n), -1))
+        elapsed = time.perf_counter() - start
+        games = int(batch.episodes.sum())
+        rate = n * STEPS / elapsed
+        print(f"{n:5d} boards: {rate:12,.0f} board-ticks/sec, {games} games")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Headless bot tournament.
+
+Plays the A* autopilot, the Hamiltonian-cycle solver and the MCTS bot on
+the same seeded boards, with the same per-tick planning budget where a
+bot has one, and reports the mean score, game length and planning time
+per tick. Games still running after the tick cap are scored as they
+stand.
+
+    python bench_bots.py [games] [budget_ms]
+"""
+
+import sys
+import time
+
+from snake_autopilot import Autopilot
+from snake_engine import SnakeEngine
+from snake_hamilton import HamiltonianSolver
+from snake_mcts import MctsBot
+
+COLS, ROWS = 20, 15
+MAX_TICKS = 5000
+
+
+def play(make_bot, seed: int):
+    engine = SnakeEngine(COLS, ROWS, seed=seed)
+    bot = make_bot(engine)
+    thinking = 0.0
+    while not engine.game_over and engine.ticks < MAX_TICKS:
+        start = time.perf_counter()
+        direction = bot.next_direction()
+        thinking += time.perf_counter() - start
+        engine.step(direction)
+    ticks = max(engine.ticks, 1)
+    return engine.score, engine.ticks, thinking / ticks * 1000
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    budget_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    bots = (
+        ("autopilot", lambda engine: Autopilot(engine, budget_ms)),
+        (
+            "hamilton",
+            lambda engine: HamiltonianSolver(engine, Autopilot(engine, budget_ms)),
+        ),
+        ("mcts", lambda engine: MctsBot(engine, budget_ms)),
+    )
+    print(
+        f"{COLS}x{ROWS}, {games} games, {budget_ms:g} ms budget, "
+        f"{MAX_TICKS} tick cap"
+    )
+    for name, make_bot in bots:
+        results = [play(make_bot, seed) for seed in range(games)]
+        score = sum(r[0] for r in results) / games
+        ticks = sum(r[1] for r in results) / games
+        ms = sum(r[2] for r in results) / games
+        print(f"  {name:10s} score {score:7.0f}  ticks {ticks:6.0f}  {ms:5.2f} ms/tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Incremental vs full-recompute cost of the BFS distance fields.
+
+Plays autopilot games on 20x20 and 40x30 boards and, after every tick,
+times DistanceFields.update() against rebuilding both fields with a
+fresh BFS, checking now and then that the two agree.
+
+    python bench_distance.py [ticks]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from snake_autopilot import Autopilot
+from snake_distance import DistanceField, DistanceFields
+from snake_engine import SnakeEngine
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    for cols, rows in ((20, 20), (40, 30)):
+        engine = SnakeEngine(cols, rows, seed=0)
+        bot = Autopilot(engine)
+        fields = DistanceFields(engine)
+        food = DistanceField(cols, rows, engine.grid.flags)
+        tail = DistanceField(cols, rows, engine.grid.flags)
+        incremental = full = 0.0
+        for tick in range(ticks):
+            if engine.game_over:
+                engine.reset(tick)
+                bot.reset()
+            else:
+                engine.step(bot.next_direction())
+
+            start = time.perf_counter()
+            fields.update()
+            incremental += time.perf_counter() - start
+
+            start = time.perf_counter()
+            f = engine.food
+            food.recompute(-1 if f is None else f[1] * cols + f[0])
+            tail.recompute(engine.snake.tail_index)
+            full += time.perf_counter() - start
+
+            if tick % 100 == 0:
+                assert np.array_equal(fields.food.dist, food.dist)
+                assert np.array_equal(fields.tail.dist, tail.dist)
+
+        f = fields.food
+        print(
+            f"{cols}x{rows}: update() {incremental / ticks * 1e6:7.1f} us/tick  "
+            f"full BFS {full / ticks * 1e6:7.1f} us/tick  "
+            f"(food field: {f.repairs} repairs, {f.recomputes} recomputes, "
+            f"{f.touched / max(f.repairs, 1):.0f} cells/repair)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the Gymnasium environments.
+
+Steps SnakeEnv and SnakeVectorEnv with 1, 64 and 1024 boards of random
+actions for both observation types and reports environment steps per
+second (one step of one board each), observations included.
+
+    python bench_env.py [steps]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from snake_env import OBS_TYPES, SnakeEnv, SnakeVectorEnv
+
+
+def bench_single(obs_type: str, steps: int) -> float:
+    env = SnakeEnv(obs_type=obs_type)
+    env.reset(seed=0)
+    actions = np.random.default_rng(1).integers(0, 4, steps)
+    start = time.perf_counter()
+    for action in actions:
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def bench_vector(n: int, obs_type: str, steps: int) -> float:
+    env = SnakeVectorEnv(n, obs_type=obs_type)
+    env.reset(seed=0)
+    actions = np.random.default_rng(1).integers(0, 4, (steps, n))
+    start = time.perf_counter()
+    for batch in actions:
+        env.step(batch)
+    return n * steps / (time.perf_counter() - start)
+
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    for obs_type in OBS_TYPES:
+        print(f"{obs_type} observations")
+        rate = bench_single(obs_type, steps * 10)
+        print(f"  SnakeEnv             {rate:12,.0f} steps/sec")
+        for n in (1, 64, 1024):
+            rate = bench_vector(n, obs_type, steps)
+            print(f"  SnakeVectorEnv {n:5d} {rate:12,.0f} steps/sec")
+
+
+if __name__ == "__main__":
+    main()
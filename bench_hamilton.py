@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Moves-to-win benchmark for HamiltonianSolver.
+
+Plays headless games on 20x20 and 40x30 boards, without obstacles (every
+cell is on the cycle, so every game should be won) and with the engine's
+default obstacles. With obstacles some free cells are missed by the
+cycle; food there is fetched by excursions off the cycle, but the body
+can never be longer than the cycle, so those games stall (or are lost,
+if the A* detour takes a risk). A game is stopped as stalled once the
+snake has not grown for STALL_LAPS board-sized laps, or at the move cap.
+The fill column is the snake's final length as a share of the cells free
+of obstacles.
+
+    python bench_hamilton.py [games]
+"""
+
+import sys
+import time
+
+from snake_engine import MAX_OBSTACLES, SnakeEngine
+from snake_hamilton import HamiltonianSolver
+
+BOARDS = ((20, 20), (40, 30))
+STALL_LAPS = 10
+
+
+def play(cols: int, rows: int, seed: int, obstacles: int):
+    engine = SnakeEngine(cols, rows, seed=seed, max_obstacles=obstacles)
+    solver = HamiltonianSolver(engine)
+    cap = int(8 * (cols * rows) ** 1.5)
+    stall = STALL_LAPS * cols * rows
+    moves = grew = 0
+    length = engine.snake.length
+    while not engine.game_over and moves < cap and moves - grew < stall:
+        engine.step(solver.next_direction())
+        moves += 1
+        if engine.snake.length != length:
+            length, grew = engine.snake.length, moves
+    won = engine.game_over and engine.food is None
+    fill = engine.snake.length / (cols * rows - len(engine.obstacles))
+    return won, engine.game_over, moves, fill, solver
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    for cols, rows in BOARDS:
+        for obstacles in (0, MAX_OBSTACLES):
+            start = time.perf_counter()
+            results = [play(cols, rows, seed, obstacles) for seed in range(games)]
+            elapsed = time.perf_counter() - start
+            wins = [moves for won, _, moves, _, _ in results if won]
+            lost = sum(over and not won for won, over, _, _, _ in results)
+            fill = sum(r[3] for r in results) / games
+            solvers = [r[4] for r in results]
+            missed = sum(s.missed for s in solvers) / games
+            excursions = sum(s.excursions for s in solvers) / games
+            detours = sum(s.detours for s in solvers) / games
+            avg = f"{sum(wins) / len(wins):9.0f}" if wins else "        -"
+            print(
+                f"{cols}x{rows} {obstacles:2d} obstacles: "
+                f"won {len(wins)}/{games} lost {lost}  moves-to-win {avg}  "
+                f"fill {fill:4.0%}  missed {missed:4.1f}  "
+                f"excursions {excursions:5.0f}  detours {detours:6.0f}  "
+                f"({elapsed:.1f} s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
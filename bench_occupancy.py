@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tick-time benchmark for SnakeEngine.step() at increasing snake lengths.
+
+The snake follows a Hamiltonian cycle of the default 40x30 board so it
+never dies, up to a board with a single free cell. With the occupancy
+grid the per-tick cost should stay flat as the snake grows.
+
+    python bench_occupancy.py
+"""
+
+import time
+from typing import List, Tuple
+
+from snake_engine import SnakeEngine
+
+TICKS = 20000
+
+
+def serpentine_cycle(cols: int, rows: int) -> List[Tuple[int, int]]:
+    """Hamiltonian cycle for a board with an even number of rows."""
+    cycle = [(x, 0) for x in range(cols)]
+    for y in range(1, rows):
+        xs = range(cols - 1, 0, -1) if y % 2 else range(1, cols)
+        cycle.extend((x, y) for x in xs)
+    cycle.extend((0, y) for y in range(rows - 1, 0, -1))
+    return cycle
+
+
+def bench_length(
+    game: SnakeEngine, cycle: List[Tuple[int, int]], length: int
+) -> float:
+    n = len(cycle)
+    head = length - 1
+    game.snake.reset(cycle[(head - i) % n] for i in range(length))
+    game.obstacles = []
+    game.power_ups = []
+    game.food = (-1, -1)  # off the board, never eaten
+    game.invincible = False
+    game.game_over = False
+    game.grid.rebuild(game.snake)
+
+    directions = []
+    for i in range(n):
+        (x0, y0), (x1, y1) = cycle[i], cycle[(i + 1) % n]
+        directions.append((x1 - x0, y1 - y0))
+    game.direction = directions[(head - 1) % n]
+
+    start = time.perf_counter()
+    for t in range(TICKS):
+        game.step(directions[(head + t) % n])
+    elapsed = time.perf_counter() - start
+    assert not game.game_over, f"snake died at length {length}"
+    return elapsed / TICKS * 1e6
+
+
+def main():
+    game = SnakeEngine(40, 30, seed=0)
+    cycle = serpentine_cycle(game.grid.cols, game.grid.rows)
+    cells = len(cycle)
+    print(f"board {game.grid.cols}x{game.grid.rows}, {TICKS} ticks per length")
+    for length in (3, 50, 200, 600, 1000, cells - 1):
+        usec = bench_length(game, cycle, length)
+        print(f"length {length:5d}: {usec:7.2f} us/tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Training benchmark for the Q-learning agents.
+
+Trains TabularQ and LinearQ on 64 boards of 20x20 for the given number
+of episodes, printing the learning curve (mean score per window of
+finished games) and training throughput in episodes per second, then the
+mean score of greedy play.
+
+    python bench_qlearn.py [episodes]
+"""
+
+import sys
+
+from snake_qlearn import AGENTS, QTrainer
+
+
+def main():
+    episodes = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    for name, agent_type in AGENTS.items():
+        trainer = QTrainer(agent_type(), explore_episodes=episodes // 2)
+        print(f"{name}")
+        for done, score in trainer.train(episodes, report_every=episodes // 10):
+            print(f"  {done:7d} episodes  mean score {score:6.2f}")
+        print(f"  {trainer.summary()}")
+        print(f"  greedy mean score {trainer.evaluate():.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Cell drawing benchmark for SnakeRenderer.
+
+Fills 1,000 and 10,000 on-screen cells with snake, food and power-up
+flags and times a full repaint drawn from the sprite atlas (one blits()
+call) against one pygame.draw.rect() per cell. Runs headless with SDL's
+dummy video driver unless SDL_VIDEODRIVER is already set.
+
+    python bench_render.py [frames]
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from snake_engine import SnakeEngine  # noqa: E402
+from snake_grid import FOOD, POWER_UP, SNAKE  # noqa: E402
+from snake_render import SnakeRenderer, blit_all, cell_color  # noqa: E402
+from snake_view import Camera, visible_cells  # noqa: E402
+
+CELL = 8
+WIDTH, HEIGHT = 1000, 800  # 125x100 cells
+
+
+def board_with(cells: int) -> SnakeEngine:
+    cols, rows = WIDTH // CELL, HEIGHT // CELL
+    engine = SnakeEngine(cols, rows, seed=0)
+    grid = engine.grid
+    layers = (SNAKE, SNAKE, FOOD, POWER_UP)
+    placed = 0
+    for i in range(cols * rows):
+        if placed == cells:
+            break
+        cell = (i % cols, i // cols)
+        if not grid.flags[i]:
+            grid.set(cell, layers[placed % len(layers)])
+            placed += 1
+    return engine
+
+
+def time_frames(draw, frames: int) -> float:
+    start = time.perf_counter()
+    for _ in range(frames):
+        draw()
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+
+    for cells in (1000, 10000):
+        engine = board_with(cells)
+        camera = Camera(WIDTH, HEIGHT, CELL, engine.cols, engine.rows)
+        renderer = SnakeRenderer(screen, engine, camera, CELL)
+        head = engine.snake[0]
+        view = camera.visible_range()
+
+        def atlas():
+            blit_all(screen, renderer._cell_blits(*view, head, None))
+
+        def rects():
+            for x, y, f in visible_cells(engine.grid, *view):
+                rect = (*camera.to_screen(x, y), CELL, CELL)
+                pygame.draw.rect(screen, cell_color(f), rect)
+
+        def full_repaint():
+            renderer.invalidate()
+            renderer.draw(head, None, [])
+
+        print(f"{cells} visible cells")
+        for name, draw in (
+            ("draw.rect per cell:", rects),
+            ("atlas blits():", atlas),
+            ("full repaint+flip:", full_repaint),
+        ):
+            print(f"  {name:20s} {time_frames(draw, frames):6.2f} ms/frame")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
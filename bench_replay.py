@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Replay verification benchmark.
+
+Records games played by a cautious random bot, round-trips them through
+the packed replay format and reports how fast run_replay() re-simulates
+them compared with stepping SnakeEngine directly. Fails unless
+run_replay() manages TARGET ticks per second (best of RUNS).
+
+    python bench_replay.py
+"""
+
+import random
+import time
+
+from snake_engine import DIRECTIONS, SnakeEngine
+from snake_replay import Replay, ReplayRecorder, run_replay, verify
+
+GAMES = 30
+RUNS = 3
+TARGET = 1_000_000  # ticks/sec
+
+
+def record_game(seed: int) -> Replay:
+    engine = SnakeEngine(40, 30, seed)
+    recorder = ReplayRecorder(engine)
+    policy = random.Random(seed)
+    while not engine.game_over:
+        x, y = engine.snake[0]
+        safe = [
+            (dx, dy)
+            for dx, dy in DIRECTIONS
+            if engine.grid.in_bounds((x + dx, y + dy))
+            and not engine.grid.is_blocked((x + dx, y + dy))
+        ]
+        if engine.direction in safe and policy.random() < 0.8:
+            direction = engine.direction
+        else:
+            direction = policy.choice(safe) if safe else None
+        engine.step(direction)
+        recorder.record_tick()
+    return Replay.from_bytes(recorder.finish().to_bytes())
+
+
+def main():
+    replays = [record_game(seed) for seed in range(GAMES)]
+    ticks = sum(len(replay) for replay in replays)
+    size = sum(len(replay.to_bytes()) for replay in replays)
+    print(f"{GAMES} games, {ticks} ticks, {size} bytes of replays")
+    assert all(verify(replay) for replay in replays)
+
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        for replay in replays:
+            run_replay(replay)
+        best = min(best, time.perf_counter() - start)
+    rate = ticks / best
+    print(f"run_replay:         {rate:12,.0f} ticks/sec")
+
+    start = time.perf_counter()
+    for replay in replays:
+        engine = SnakeEngine(replay.cols, replay.rows, replay.seed)
+        for code in replay.codes:
+            engine.step(DIRECTIONS[code])
+    elapsed = time.perf_counter() - start
+    print(f"SnakeEngine.step(): {ticks / elapsed:12,.0f} ticks/sec")
+    assert rate >= TARGET, f"run_replay() below {TARGET:,} ticks/sec"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for RolloutFarm.
+
+Runs the farm with 1, 2, 4, ... workers up to the core count for a few
+seconds each, collecting trajectories as a consumer would, and reports
+aggregate steps per second and the speedup over one worker.
+
+    python bench_rollout.py [policy] [seconds]
+"""
+
+import os
+import sys
+import time
+
+from snake_rollout import RolloutFarm
+
+
+def worker_counts():
+    cores = os.cpu_count() or 1
+    n = 1
+    while n < cores:
+        yield n
+        n *= 2
+    yield cores
+
+
+def main():
+    policy = sys.argv[1] if len(sys.argv) > 1 else "autopilot"
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    print(f"{policy} policy, {os.cpu_count()} cores")
+    base = None
+    for workers in worker_counts():
+        with RolloutFarm(workers, policy, seed=0) as farm:
+            time.sleep(0.5)  # let every worker get going
+            farm.collect()
+            warmup_dropped = farm.dropped
+            start = time.perf_counter()
+            records = 0
+            while time.perf_counter() - start < seconds:
+                time.sleep(0.05)
+                records += len(farm.collect())
+                farm.poll()
+            rate = records / (time.perf_counter() - start)
+            dropped = farm.dropped - warmup_dropped
+        base = base or rate
+        print(
+            f"{workers:4d} workers: {rate:12,.0f} steps/sec  "
+            f"x{rate / base:5.2f}  dropped {dropped}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Snapshot/restore cost for SnakeEngine look-ahead.
+
+Times snapshot(), restore() and a full one-ply expansion (restore, step,
+snapshot) from a mid-game position on the default 40x30 board, and
+checks that sibling branches share the parent's RNG and obstacle state.
+
+    python bench_snapshot.py
+"""
+
+import random
+import timeit
+
+from snake_engine import DIRECTIONS, SnakeEngine
+
+N = 20000
+
+
+def main():
+    engine = SnakeEngine(40, 30, seed=5)
+    policy = random.Random(0)
+    for tick in range(300):
+        engine.step(policy.choice(DIRECTIONS) if policy.random() < 0.1 else None)
+        if engine.game_over:
+            engine.reset(tick)
+    root = engine.snapshot()
+
+    children = []
+    for direction in DIRECTIONS:
+        engine.restore(root)
+        engine.step(direction)
+        children.append(engine.snapshot())
+    shared = sum(child.rng_state is root.rng_state for child in children)
+    print(f"{shared}/{len(children)} children share the parent RNG state")
+
+    engine.restore(root)
+    usec = timeit.timeit(engine.snapshot, number=N) / N * 1e6
+    print(f"snapshot():              {usec:6.2f} us")
+    usec = timeit.timeit(lambda: engine.restore(root), number=N) / N * 1e6
+    print(f"restore():               {usec:6.2f} us")
+
+    def expand():
+        engine.restore(root)
+        engine.step()
+        engine.snapshot()
+
+    usec = timeit.timeit(expand, number=N) / N * 1e6
+    print(f"restore+step+snapshot(): {usec:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Adaptive frame budget for the pygame frontends.
+
+FrameBudget records how long each frame spent in update() and draw().
+Once a full window of frames has been seen at the current quality tier it
+compares the p95 frame cost with the tier's budget (one frame period at
+the tier's frame rate): over budget steps one tier down; comfortably
+under the next tier up's budget steps back up. Different thresholds for
+the two directions and a fresh window after every change keep the tier
+from flapping.
+"""
+
+import logging
+from collections import deque
+from typing import Deque, NamedTuple, Sequence
+
+from frame_metrics import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class QualityTier(NamedTuple):
+    """Rendering effects enabled at one quality level."""
+
+    name: str
+    fps_divisor: int  # frame rate is the requested fps divided by this
+    cell_borders: bool  # grid lines and sprite outlines
+    interpolate: bool  # head and tail slide between cells between ticks
+    hud_interval_ms: int  # minimum time between HUD refreshes; 0 every frame
+
+
+TIERS = (
+    QualityTier("high", 1, True, True, 0),
+    QualityTier("medium", 1, False, True, 250),
+    QualityTier("low", 2, False, False, 500),
+    QualityTier("minimal", 3, False, False, 1000),
+)
+
+
+class FrameBudget:
+    """Quality governor driven by p95 update + draw cost per frame."""
+
+    def __init__(
+        self,
+        fps: int,
+        tiers: Sequence[QualityTier] = TIERS,
+        window: int = 120,
+        headroom: float = 0.5,
+    ):
+        self.base_fps = fps
+        self.tiers = tuple(tiers)
+        self.window = window
+        # Step up only when p95 fits in this fraction of the higher budget
+        self.headroom = headroom
+        self.level = 0
+        self.changes = 0
+        self.update_ms: Deque[float] = deque(maxlen=window)
+        self.draw_ms: Deque[float] = deque(maxlen=window)
+        self.frame_ms: Deque[float] = deque(maxlen=window)
+
+    @property
+    def tier(self) -> QualityTier:
+        return self.tiers[self.level]
+
+    @property
+    def fps(self) -> int:
+        return max(1, self.base_fps // self.tier.fps_divisor)
+
+    def budget_ms(self, level: int) -> float:
+        return 1000 * self.tiers[level].fps_divisor / self.base_fps
+
+    def record(self, update_ms: float, draw_ms: float) -> bool:
+        """Add one frame's costs; returns True if the tier changed."""
+        self.update_ms.append(update_ms)
+        self.draw_ms.append(draw_ms)
+        self.frame_ms.append(update_ms + draw_ms)
+        if len(self.frame_ms) < self.window:
+            return False
+
+        p95 = percentile(sorted(self.frame_ms), 95)
+        if p95 > self.budget_ms(self.level) and self.level < len(self.tiers) - 1:
+            self._change(1, p95)
+            return True
+        if self.level > 0 and p95 < self.headroom * self.budget_ms(self.level - 1):
+            self._change(-1, p95)
+            return True
+        return False
+
+    def _change(self, step: int, p95: float):
+        old = self.tier
+        self.level += step
+        self.changes += 1
+        self.update_ms.clear()
+        self.draw_ms.clear()
+        self.frame_ms.clear()
+        logger.info(
+            f"Quality {old.name} -> {self.tier.name}: p95 frame {p95:.1f} ms, "
+            f"budget {self.budget_ms(self.level - step):.1f} ms"
+        )
+
+    def summary(self) -> str:
+        update = percentile(sorted(self.update_ms), 95)
+        draw = percentile(sorted(self.draw_ms), 95)
+        return (
+            f"quality {self.tier.name}  p95 update {update:.1f} + draw "
+            f"{draw:.1f} ms / {self.budget_ms(self.level):.1f} ms"
+        )
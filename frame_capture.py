@@ -0,0 +1,204 @@
+"""
+Asynchronous frame capture for the pygame frontends.
+
+FrameCapture copies each presented frame into one of a fixed pool of
+preallocated surfaces (a plain blit, no allocation) and hands it to a
+background writer thread. The writer appends raw RGB frames to a file,
+saves a numbered PNG sequence, or pipes raw frames into the stdin of an
+ffmpeg-compatible encoder. When every pooled surface is still waiting to
+be written the frame is dropped and counted; capture() never blocks the
+game loop.
+
+The window is resizable. A PNG sequence follows a resize: the pool is
+reallocated at the new size once, and surfaces of the old size are
+discarded (and counted as stale) as they come back from the writer. Raw
+and ffmpeg streams have a fixed frame size, so a resize stops them with a
+logged error.
+"""
+
+import logging
+import os
+import queue
+import shlex
+import subprocess
+import threading
+from typing import BinaryIO, List, Optional, Tuple
+
+import pygame
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("raw", "png", "ffmpeg")
+
+
+def guess_format(path: str) -> str:
+    """Capture format implied by an output path."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".rgb", ".raw"):
+        return "raw"
+    if ext in ("", ".png"):
+        return "png"
+    return "ffmpeg"
+
+
+def ffmpeg_command(size: Tuple[int, int], fps: int, path: str) -> List[str]:
+    """ffmpeg invocation encoding raw RGB frames from stdin to ``path``."""
+    return [
+        "ffmpeg",
+        "-loglevel", "error",
+        "-y",
+        "-f", "rawvideo",
+        "-pix_fmt", "rgb24",
+        "-s", f"{size[0]}x{size[1]}",
+        "-r", str(fps),
+        "-i", "-",
+        "-pix_fmt", "yuv420p",
+        path,
+    ]  # fmt: skip
+
+
+class FrameCapture:
+    """Background recorder for presented frames.
+
+    ``fmt`` is "raw" (frames appended to one file as RGB24), "png" (a
+    directory of frame_000000.png ...) or "ffmpeg" (RGB24 frames piped to
+    ``command``, by default ffmpeg_command() encoding to ``path``).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        size: Tuple[int, int],
+        fmt: Optional[str] = None,
+        fps: int = 60,
+        pool_size: int = 8,
+        command: Optional[str] = None,
+    ):
+        fmt = fmt or guess_format(path)
+        if fmt not in FORMATS:
+            raise ValueError(
+                f"Unknown capture format {fmt!r}, expected one of {FORMATS}"
+            )
+        self.path = path
+        self.size = size
+        self.fmt = fmt
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self.stale = 0  # pooled surfaces discarded after a resize
+        self.error: Optional[BaseException] = None
+
+        self._out: Optional[BinaryIO] = None
+        self._proc: Optional[subprocess.Popen] = None
+        if fmt == "raw":
+            self._out = open(path, "wb")
+        elif fmt == "png":
+            os.makedirs(path, exist_ok=True)
+        else:
+            args = shlex.split(command) if command else ffmpeg_command(size, fps, path)
+            self._proc = subprocess.Popen(args, stdin=subprocess.PIPE)
+            self._out = self._proc.stdin
+
+        # Surfaces cycle free -> pending -> written -> free; matching the
+        # display format keeps the copy in capture() a plain memcpy
+        self.pool_size = pool_size
+        self._free = self._allocate(size, pygame.display.get_surface())
+        self._pending: "queue.SimpleQueue[Optional[Tuple[int, pygame.Surface]]]" = (
+            queue.SimpleQueue()
+        )
+        self._thread = threading.Thread(
+            target=self._write_frames, name="frame-capture", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Capturing {size[0]}x{size[1]} frames as {fmt} to {path}")
+
+    def capture(self, surface: pygame.Surface) -> bool:
+        """Queue a copy of ``surface``; returns False if the frame was dropped."""
+        if self.error is not None:
+            return False
+        size = surface.get_size()
+        if size != self.size and not self._resize(size):
+            return False
+        while True:
+            try:
+                frame = self._free.get_nowait()
+            except queue.Empty:
+                self.dropped += 1
+                return False
+            if frame.get_size() == size:
+                break
+            # Returned by the writer while _resize() swapped the pool
+            self.stale += 1
+        frame.blit(surface, (0, 0))
+        self._pending.put((self.captured, frame))
+        self.captured += 1
+        return True
+
+    def _resize(self, size: Tuple[int, int]) -> bool:
+        if self.fmt != "png":
+            self.error = ValueError(
+                f"frame size changed from {self.size[0]}x{self.size[1]} "
+                f"to {size[0]}x{size[1]}"
+            )
+            logger.error(f"Frame capture to {self.path} stopped: {self.error}")
+            return False
+        logger.info(f"Capturing {size[0]}x{size[1]} frames from now on")
+        self.size = size
+        self._free = self._allocate(size, pygame.display.get_surface())
+        return True
+
+    def _allocate(
+        self, size: Tuple[int, int], display: Optional[pygame.Surface]
+    ) -> "queue.SimpleQueue[pygame.Surface]":
+        free: "queue.SimpleQueue[pygame.Surface]" = queue.SimpleQueue()
+        for _ in range(self.pool_size):
+            if display is not None:
+                free.put(pygame.Surface(size, 0, display))
+            else:
+                free.put(pygame.Surface(size))
+        return free
+
+    def _write_frames(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            index, frame = item
+            if self.error is None:
+                try:
+                    self._write(index, frame)
+                    self.written += 1
+                except (OSError, pygame.error) as e:
+                    # Stop writing but keep recycling frames for capture()
+                    self.error = e
+                    logger.error(f"Frame capture to {self.path} failed: {e}")
+            if frame.get_size() == self.size:
+                self._free.put(frame)
+            else:
+                # Pooled before a resize; _resize() allocated its replacement
+                self.stale += 1
+
+    def _write(self, index: int, frame: pygame.Surface):
+        if self.fmt == "png":
+            pygame.image.save(frame, os.path.join(self.path, f"frame_{index:06d}.png"))
+        else:
+            self._out.write(pygame.image.tobytes(frame, "RGB"))
+
+    def close(self):
+        """Write out queued frames, stop the writer and close the output."""
+        self._pending.put(None)
+        self._thread.join()
+        if self._out is not None:
+            try:
+                self._out.close()
+            except OSError as e:
+                logger.error(f"Closing capture output failed: {e}")
+        if self._proc is not None:
+            self._proc.wait()
+        logger.info(self.summary())
+
+    def summary(self) -> str:
+        return (
+            f"capture: {self.written} frames written to {self.path}, "
+            f"{self.dropped} dropped, {self.stale} stale"
+        )
@@ -0,0 +1,95 @@
+"""
+Timing instrumentation for the pygame frontends.
+
+LatencyTracker follows each direction keypress from the moment its KEYDOWN
+event is polled, through the logic tick that applies it, to the
+display.flip() that first shows the result. Ticks and frames may run on
+different threads.
+"""
+
+import csv
+import math
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(len(sorted_values) * pct / 100)
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+class LatencyTracker:
+    """Input-to-display latency samples, kept for the last ``history`` keys."""
+
+    def __init__(self, history: int = 10000):
+        # (keydown, update, present) timestamps from time.perf_counter()
+        self.samples: Deque[Tuple[float, float, float]] = deque(maxlen=history)
+        self._pending: List[Tuple[float, float]] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def now() -> float:
+        return time.perf_counter()
+
+    def consumed(self, pressed: float):
+        """A logic tick just applied the input polled at ``pressed``."""
+        with self._lock:
+            self._pending.append((pressed, time.perf_counter()))
+
+    def presented(self, through: Optional[float] = None):
+        """A frame was just flipped showing inputs consumed up to ``through``.
+
+        ``through`` defaults to now, i.e. every input consumed so far.
+        """
+        if not self._pending:
+            return
+        shown = time.perf_counter()
+        if through is None:
+            through = shown
+        with self._lock:
+            waiting = []
+            for pressed, updated in self._pending:
+                if updated <= through:
+                    self.samples.append((pressed, updated, shown))
+                else:
+                    waiting.append((pressed, updated))
+            self._pending = waiting
+
+    def latencies_ms(self) -> List[float]:
+        return sorted((shown - pressed) * 1000 for pressed, _, shown in self.samples)
+
+    def percentiles(self, pcts: Iterable[float] = (50, 95, 99)) -> Dict[float, float]:
+        """Keypress-to-flip latency percentiles in milliseconds."""
+        values = self.latencies_ms()
+        return {pct: percentile(values, pct) for pct in pcts}
+
+    def summary(self) -> str:
+        if not self.samples:
+            return "input latency: no samples"
+        p = self.percentiles()
+        return (
+            f"input latency p50 {p[50]:.1f} ms  p95 {p[95]:.1f} ms  "
+            f"p99 {p[99]:.1f} ms  (n={len(self.samples)})"
+        )
+
+    def write_csv(self, path: str):
+        """Dump every sample with its key-to-update and update-to-flip split."""
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                ["keydown_s", "key_to_update_ms", "update_to_flip_ms", "total_ms"]
+            )
+            for pressed, updated, shown in self.samples:
+                writer.writerow(
+                    [
+                        f"{pressed:.6f}",
+                        f"{(updated - pressed) * 1000:.3f}",
+                        f"{(shown - updated) * 1000:.3f}",
+                        f"{(shown - pressed) * 1000:.3f}",
+                    ]
+                )
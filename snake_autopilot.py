@@ -0,0 +1,269 @@
+"""
+A* autopilot for SnakeEngine.
+
+Autopilot.next_direction() is called once per tick, before step(). It
+plans a path from the head to the food with A* on the occupancy grid,
+treating each body segment as an obstacle only until the tick the tail
+will have moved off it, and accepts the path only if the tail is still
+reachable from the head once the snake has eaten (so it cannot trap
+itself). While the head follows the plan and only the head and tail move,
+the rest of the path stays valid and is reused without searching again;
+a new search starts when the food moves or the plan is blocked. Without
+a safe path it takes the move that keeps the tail reachable and the most
+room free. After circling for a board's worth of ticks it takes an
+unproven path rather than loop forever, if the snake will at least have
+room for its body once it has eaten.
+
+Each call works to a wall-clock budget (``budget_ms``); a search that
+runs out of time is abandoned for a fallback move this tick, so planning
+cannot hold up the frame. Timings and outcomes are kept for reporting.
+"""
+
+import heapq
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from frame_metrics import percentile
+from snake_engine import DOWN, LEFT, RIGHT, UP, Direction, SnakeEngine
+from snake_grid import BLOCKING, OBSTACLE, SNAKE
+
+# Checked against the deadline every this many node expansions
+_CHECK_EVERY = 64
+
+
+def step_direction(head: int, target: int) -> Direction:
+    """Heading that moves from flat index ``head`` to the adjacent ``target``."""
+    diff = target - head
+    if diff == 1:
+        return RIGHT
+    if diff == -1:
+        return LEFT
+    return DOWN if diff > 0 else UP
+
+
+class Autopilot:
+    """Picks a heading for every tick of a SnakeEngine game."""
+
+    def __init__(self, engine: SnakeEngine, budget_ms: float = 2.0):
+        self.engine = engine
+        self.budget_ms = budget_ms
+        self.path: Deque[int] = deque()  # cells still to enter, head excluded
+        self._goal: Optional[int] = None
+        self._expect_head: Optional[int] = None
+
+        self.plans = 0  # searches that produced a safe path
+        self.reused = 0  # ticks that followed an existing plan
+        self.fallbacks = 0  # ticks without a safe path to the food
+        self.overruns = 0  # searches cut short by the budget
+        self.gambles = 0  # unproven paths taken after a long stall
+        self._stalled = 0  # fallback ticks in a row
+        self.plan_ms: Deque[float] = deque(maxlen=1000)
+
+    def reset(self):
+        """Forget the current plan, e.g. after engine.reset() or restore()."""
+        self.path.clear()
+        self._goal = None
+        self._expect_head = None
+        self._stalled = 0
+
+    def next_direction(self) -> Direction:
+        """Heading to apply on the coming tick."""
+        start = time.perf_counter()
+        try:
+            target = self._choose(start + self.budget_ms / 1000)
+        finally:
+            self.plan_ms.append((time.perf_counter() - start) * 1000)
+        if target is None:
+            return self.engine.direction
+        self._expect_head = target
+        return step_direction(self.engine.snake.head_index, target)
+
+    def _choose(self, deadline: float) -> Optional[int]:
+        engine = self.engine
+        head = engine.snake.head_index
+        food = engine.food
+        goal = None if food is None else food[1] * engine.cols + food[0]
+
+        # Only the head and tail moved along the plan: the rest still holds
+        path = self.path
+        if path and goal == self._goal and head == self._expect_head:
+            if not engine.grid.flags[path[0]] & BLOCKING:
+                self.reused += 1
+                return path.popleft()
+        path.clear()
+
+        if goal is not None:
+            body = list(engine.snake.indices())
+            found = self._astar(head, goal, body, deadline)
+            if found:
+                # Circling the tail for a whole board's worth of ticks
+                # without a provably safe path: take the food anyway if
+                # there is at least room for the body afterwards
+                safe, roomy = self._after_eating(found, body, deadline)
+                stalled = self._stalled > engine.cols * engine.rows
+                if safe or (stalled and roomy):
+                    if not safe:
+                        self.gambles += 1
+                    self.plans += 1
+                    self._stalled = 0
+                    self.path = deque(found[1:])
+                    self._goal = goal
+                    return found[0]
+        self.fallbacks += 1
+        self._stalled += 1
+        return self._safe_move(deadline)
+
+    def _astar(
+        self, start: int, goal: int, body: List[int], deadline: float
+    ) -> Optional[List[int]]:
+        """Shortest path start -> goal (start excluded) through cells free
+        on arrival, or None if there is none or the budget ran out."""
+        engine = self.engine
+        cols, rows = engine.cols, engine.rows
+        flags = engine.grid.flags
+        # A body segment k cells from the head blocks arrivals before tick
+        # length - k + 1; overlapping segments keep the latest
+        length = len(body)
+        free_at: Dict[int, int] = {}
+        for k in range(length - 1, -1, -1):
+            free_at[body[k]] = length - k + 1
+
+        gy, gx = divmod(goal, cols)
+        best = {start: 0}
+        parent: Dict[int, int] = {}
+        sy, sx = divmod(start, cols)
+        heap: List[Tuple[int, int, int]] = [(abs(sx - gx) + abs(sy - gy), 0, start)]
+        expanded = 0
+        while heap:
+            _, neg_g, i = heapq.heappop(heap)
+            g = -neg_g
+            if g != best[i]:
+                continue
+            if i == goal:
+                path = [i]
+                while path[-1] in parent:
+                    path.append(parent[path[-1]])
+                path.pop()  # the start cell
+                path.reverse()
+                return path
+            expanded += 1
+            if expanded % _CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                self.overruns += 1
+                return None
+
+            y, x = divmod(i, cols)
+            t = g + 1
+            for j, nx, ny in (
+                (i - cols, x, y - 1),
+                (i + cols, x, y + 1),
+                (i - 1, x - 1, y),
+                (i + 1, x + 1, y),
+            ):
+                if not (0 <= nx < cols and 0 <= ny < rows):
+                    continue
+                if t >= best.get(j, t + 1):
+                    continue
+                f = flags[j]
+                if f & OBSTACLE or (f & SNAKE and t < free_at.get(j, 0)):
+                    continue
+                best[j] = t
+                parent[j] = i
+                # Ties go to the deeper node, which reaches the goal sooner
+                heapq.heappush(heap, (t + abs(nx - gx) + abs(ny - gy), -t, j))
+        return None
+
+    def _after_eating(
+        self, path: List[int], body: List[int], deadline: float
+    ) -> Tuple[bool, bool]:
+        """(tail reachable, room for the whole body) once the snake has
+        followed ``path`` and grown by one at its end."""
+        virtual = (path[::-1] + body)[: len(body) + 1]
+        reach, room = self._flood(virtual, deadline)
+        return reach, room >= len(virtual)
+
+    def _flood(self, virtual: List[int], deadline: float) -> Tuple[bool, int]:
+        """(tail reachable, free cells reachable) from the head of a
+        hypothetical body ``virtual``, listed head first."""
+        engine = self.engine
+        cols, rows = engine.cols, engine.rows
+        flags = engine.grid.flags
+        head, tail = virtual[0], virtual[-1]
+        enough = len(virtual)
+        blocked = set(virtual)
+        seen = {head}
+        queue = deque([head])
+        reach = False
+        expanded = 0
+        while queue:
+            i = queue.popleft()
+            expanded += 1
+            if expanded % _CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                self.overruns += 1
+                break
+            y, x = divmod(i, cols)
+            for j, nx, ny in (
+                (i - cols, x, y - 1),
+                (i + cols, x, y + 1),
+                (i - 1, x - 1, y),
+                (i + 1, x + 1, y),
+            ):
+                if not (0 <= nx < cols and 0 <= ny < rows) or j in seen:
+                    continue
+                # The tail is still there on the next tick, so it must be
+                # at least two moves away
+                if j == tail and i != head:
+                    reach = True
+                if j in blocked or flags[j] & OBSTACLE:
+                    continue
+                seen.add(j)
+                queue.append(j)
+            if reach and len(seen) >= enough:
+                break
+        return reach, len(seen)
+
+    def tail_reachable(self, cell: int) -> bool:
+        """Whether the tail can still be reached once the head has moved
+        into the adjacent ``cell`` (eating there if it holds the food)."""
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        body = list(self.engine.snake.indices())
+        reach, _ = self._flood(self._after_move(cell, body), deadline)
+        return reach
+
+    def _after_move(self, cell: int, body: List[int]) -> List[int]:
+        """Body, head first, after the head moves from ``body`` into ``cell``."""
+        food = self.engine.food
+        eats = food is not None and cell == food[1] * self.engine.cols + food[0]
+        return [cell] + (body if eats else body[:-1])
+
+    def _safe_move(self, deadline: float) -> Optional[int]:
+        """Open neighbour that keeps the tail reachable, then the most room."""
+        engine = self.engine
+        cols, rows = engine.cols, engine.rows
+        flags = engine.grid.flags
+        body = list(engine.snake.indices())
+        head = body[0]
+        y, x = divmod(head, cols)
+
+        best = None
+        for j, nx, ny in (
+            (head - cols, x, y - 1),
+            (head + cols, x, y + 1),
+            (head - 1, x - 1, y),
+            (head + 1, x + 1, y),
+        ):
+            if not (0 <= nx < cols and 0 <= ny < rows) or flags[j] & BLOCKING:
+                continue
+            score = self._flood(self._after_move(j, body), deadline)
+            if best is None or score > best[0]:
+                best = (score, j)
+        return None if best is None else best[1]
+
+    def summary(self) -> str:
+        p = percentile(sorted(self.plan_ms), 95)
+        return (
+            f"autopilot p95 {p:.2f} ms / {self.budget_ms:g} ms budget  "
+            f"plans {self.plans} reused {self.reused} "
+            f"fallbacks {self.fallbacks} gambles {self.gambles} "
+            f"overruns {self.overruns}"
+        )
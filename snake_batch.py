@@ -0,0 +1,256 @@
+"""
+Vectorized Snake: many boards advanced by a single NumPy step().
+
+SnakeBatch follows the same rules as SnakeEngine (wall, self and obstacle
+death, food growth, a level every 50 points, invincibility power-ups) but
+keeps N boards in stacked arrays so one step(actions) call advances all of
+them. Finished boards are reset in the same call. Random draws come from a
+NumPy generator, so a batch board and a SnakeEngine with the same seed play
+by the same rules but not the same food sequence.
+"""
+
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+from snake_engine import (
+    BASE_SPEED,
+    DIRECTIONS,
+    INVINCIBILITY_MS,
+    MAX_OBSTACLES,
+    POINTS_PER_FOOD,
+    POINTS_PER_LEVEL,
+    POWER_UP_CHANCE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Action codes (indices into snake_engine.DIRECTIONS); -1 keeps the heading
+ACTION_UP = 0
+ACTION_DOWN = 1
+ACTION_LEFT = 2
+ACTION_RIGHT = 3
+
+STEPS = np.array(DIRECTIONS, dtype=np.int64)
+OPPOSITE = np.array([ACTION_DOWN, ACTION_UP, ACTION_RIGHT, ACTION_LEFT])
+
+
+class SnakeBatch:
+    """N independent Snake boards stepped together.
+
+    Per-board state lives in arrays indexed by board: the body is a ring
+    buffer of flat cell indices (``body``, ``head_ptr``, ``tail_ptr``,
+    ``length``) and the board layers are ``snake_count``, ``obstacle`` and
+    ``power_up`` of shape (N, cols * rows) plus one ``food`` index per board.
+    """
+
+    def __init__(
+        self, n: int, cols: int = 40, rows: int = 30, seed: Optional[int] = None
+    ):
+        if cols < 3 or rows < 1:
+            raise ValueError(f"Board too small: {cols}x{rows}")
+        self.n = n
+        self.cols = cols
+        self.rows = rows
+        self.cells = cols * rows
+        self._boards = np.arange(n)
+
+        index_dtype = np.uint16 if self.cells <= 0xFFFF else np.int32
+        self.body = np.zeros((n, self.cells), dtype=index_dtype)
+        self.head_ptr = np.zeros(n, dtype=np.int64)
+        self.tail_ptr = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.direction = np.zeros(n, dtype=np.int64)
+
+        self.snake_count = np.zeros((n, self.cells), dtype=np.uint16)
+        self.obstacle = np.zeros((n, self.cells), dtype=bool)
+        self.power_up = np.zeros((n, self.cells), dtype=bool)
+        self.food = np.zeros(n, dtype=np.int64)
+
+        self.score = np.zeros(n, dtype=np.int64)
+        self.high_score = np.zeros(n, dtype=np.int64)
+        self.level = np.zeros(n, dtype=np.int64)
+        self.invincible = np.zeros(n, dtype=bool)
+        self.power_up_timer = np.zeros(n, dtype=np.int64)  # in milliseconds
+        self.ticks = np.zeros(n, dtype=np.int64)
+
+        # Outcome of the most recently finished game on each board
+        self.final_score = np.zeros(n, dtype=np.int64)
+        self.final_ticks = np.zeros(n, dtype=np.int64)
+        self.episodes = np.zeros(n, dtype=np.int64)
+
+        self.reset(seed)
+
+    def reset(self, seed: Optional[int] = None):
+        """Restart every board, reseeding the generator."""
+        self.rng = np.random.default_rng(seed)
+        self.high_score[:] = 0
+        self.episodes[:] = 0
+        self._reset_boards(self._boards)
+
+    @property
+    def heads(self) -> np.ndarray:
+        """Flat head cell index of every board."""
+        return self.body[self._boards, self.head_ptr].astype(np.int64)
+
+    @property
+    def tick_rate(self) -> np.ndarray:
+        """Logic ticks per second for each board's level."""
+        return BASE_SPEED + (self.level - 1) * 2
+
+    def _free_mask(self, boards: np.ndarray) -> np.ndarray:
+        """Cells with nothing on them, one row per board in ``boards``."""
+        free = (self.snake_count[boards] == 0) & ~self.obstacle[boards]
+        free &= ~self.power_up[boards]
+        food = self.food[boards]
+        has_food = food >= 0
+        free[np.flatnonzero(has_food), food[has_food]] = False
+        return free
+
+    def _sample_free(
+        self, boards: np.ndarray, k: int = 1
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Pick ``k`` distinct free cells per board.
+
+        Returns (cells, ok) of shape (len(boards), k); ``ok`` is False where
+        the board ran out of free cells.
+        """
+        keys = self.rng.random((boards.size, self.cells))
+        keys[~self._free_mask(boards)] = -1.0
+        if k == 1:
+            picks = keys.argmax(axis=1)[:, None]
+        else:
+            picks = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+        ok = np.take_along_axis(keys, picks, axis=1) >= 0.0
+        return picks, ok
+
+    def _reset_boards(self, boards: np.ndarray):
+        """Start a fresh game on ``boards`` (vectorized over boards)."""
+        if not boards.size:
+            return
+        cols = self.cols
+        self.snake_count[boards] = 0
+        self.obstacle[boards] = False
+        self.power_up[boards] = False
+
+        hx, hy = max(2, min(10, cols // 2)), min(10, self.rows // 2)
+        start = np.array([hx - 2, hx - 1, hx]) + hy * cols  # tail first
+        self.body[boards, :3] = start
+        self.snake_count[boards[:, None], start] = 1
+        self.tail_ptr[boards] = 0
+        self.head_ptr[boards] = 2
+        self.length[boards] = 3
+        self.direction[boards] = ACTION_RIGHT
+
+        self.score[boards] = 0
+        self.level[boards] = 1
+        self.invincible[boards] = False
+        self.power_up_timer[boards] = 0
+        self.ticks[boards] = 0
+
+        self.food[boards] = -1
+        cells, ok = self._sample_free(boards)
+        self.food[boards[ok[:, 0]]] = cells[ok[:, 0], 0]
+
+        k = min(MAX_OBSTACLES, self.cells)
+        cells, ok = self._sample_free(boards, k)
+        rows = np.broadcast_to(boards[:, None], cells.shape)
+        self.obstacle[rows[ok], cells[ok]] = True
+
+    def step(
+        self, actions: Optional[np.ndarray] = None, dt_ms: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Advance every board one tick.
+
+        ``actions`` holds one action code per board (-1 keeps the heading);
+        reversals are ignored as in SnakeEngine.turn(). Returns boolean
+        arrays (ate, done). Done boards are reset before returning, with
+        their result kept in ``final_score`` and ``final_ticks``.
+        """
+        boards = self._boards
+        cols, rows = self.cols, self.rows
+
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.int64)
+            turn = (actions >= 0) & (actions != OPPOSITE[self.direction])
+            self.direction = np.where(turn, actions, self.direction)
+
+        step = STEPS[self.direction]
+        head = self.heads
+        x = head % cols + step[:, 0]
+        y = head // cols + step[:, 1]
+        wall = (x < 0) | (x >= cols) | (y < 0) | (y >= rows)
+        target = np.clip(y, 0, rows - 1) * cols + np.clip(x, 0, cols - 1)
+
+        blocked = self.snake_count[boards, target] > 0
+        blocked |= self.obstacle[boards, target]
+        done = wall | (blocked & ~self.invincible)
+        moving = np.flatnonzero(~done)
+        target_m = target[moving]
+
+        # Push the new head
+        head_ptr = self.head_ptr[moving] + 1
+        head_ptr[head_ptr == self.cells] = 0
+        self.head_ptr[moving] = head_ptr
+        self.body[moving, head_ptr] = target_m
+        self.snake_count[moving, target_m] += 1
+        self.ticks[moving] += 1
+
+        # Pop the tail unless the snake ate
+        ate = np.zeros(self.n, dtype=bool)
+        ate[moving] = target_m == self.food[moving]
+        shrink = moving[~ate[moving]]
+        tail_ptr = self.tail_ptr[shrink]
+        self.snake_count[shrink, self.body[shrink, tail_ptr]] -= 1
+        tail_ptr += 1
+        tail_ptr[tail_ptr == self.cells] = 0
+        self.tail_ptr[shrink] = tail_ptr
+
+        eaters = np.flatnonzero(ate)
+        if eaters.size:
+            self.length[eaters] += 1
+            self.score[eaters] += POINTS_PER_FOOD
+            np.maximum(self.high_score, self.score, out=self.high_score)
+            self.level[eaters] += self.score[eaters] % POINTS_PER_LEVEL == 0
+            self.food[eaters] = -1
+            cells, ok = self._sample_free(eaters)
+            self.food[eaters[ok[:, 0]]] = cells[ok[:, 0], 0]
+            done[eaters[~ok[:, 0]]] = True  # board full
+
+        # Power-up pickup and invincibility timer
+        picked = moving[self.power_up[moving, target_m]]
+        self.power_up[picked, target[picked]] = False
+        self.invincible[picked] = True
+        self.power_up_timer[picked] = INVINCIBILITY_MS
+
+        timed = np.flatnonzero(self.invincible & ~done)
+        if timed.size:
+            if dt_ms is None:
+                elapsed = 1000 // self.tick_rate[timed]
+            else:
+                elapsed = dt_ms
+            self.power_up_timer[timed] -= elapsed
+            expired = timed[self.power_up_timer[timed] <= 0]
+            self.invincible[expired] = False
+            self.power_up_timer[expired] = 0
+
+        # Occasional power-up spawn
+        live = np.flatnonzero(~done)
+        spawning = live[self.rng.random(live.size) < POWER_UP_CHANCE]
+        if spawning.size:
+            cells, ok = self._sample_free(spawning)
+            self.power_up[spawning[ok[:, 0]], cells[ok[:, 0], 0]] = True
+
+        self.end_games(np.flatnonzero(done))
+        return ate, done
+
+    def end_games(self, boards: np.ndarray):
+        """Record the result of the games on ``boards`` and start new ones,
+        e.g. to cut off games that run too long."""
+        if not boards.size:
+            return
+        self.final_score[boards] = self.score[boards]
+        self.final_ticks[boards] = self.ticks[boards]
+        self.episodes[boards] += 1
+        self._reset_boards(boards)
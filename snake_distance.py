@@ -0,0 +1,233 @@
+"""
+Incrementally maintained BFS distance fields over a SnakeEngine board.
+
+A DistanceField holds the walking distance from one source cell to every
+cell through cells that are not BLOCKING (snake or obstacle). Instead of
+a fresh BFS after every change it repairs itself locally:
+
+- unblock(): a cell opened up (the tail moved off it). It takes its best
+  neighbour's distance + 1 and the decrease spreads outward only as far
+  as it improves anything.
+- block(): a cell closed (the head moved onto it). Only the cells whose
+  every shortest path ran through it are invalidated, in increasing
+  distance order, then refilled from their still-valid neighbours.
+
+A field whose source moves gets a full recompute: even a one-cell step
+shifts most distances by one, so repairing it rewrites about as many
+cells as a fresh BFS at a higher cost per cell.
+
+DistanceFields attaches a food and a tail field to an engine; call
+update() after every step() and it works out which of the above apply.
+The food field is repaired on almost every tick and only recomputed when
+food respawns; the tail field moves with the tail, so it is recomputed
+each tick except while the snake grows.
+
+Distances live in ``array('i')`` buffers exposed as (rows, cols) int32
+NumPy views without copying; cells that cannot be reached hold
+UNREACHABLE.
+"""
+
+from array import array
+from collections import deque
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from snake_engine import SnakeEngine
+from snake_grid import BLOCKING
+
+UNREACHABLE = 2**31 - 1
+
+
+class DistanceField:
+    """Single-source BFS distances on a board's occupancy flags."""
+
+    def __init__(self, cols: int, rows: int, flags: bytearray):
+        self.cols = cols
+        self.rows = rows
+        self.flags = flags
+        self.source = -1
+        self._dist = array("i", [UNREACHABLE]) * (cols * rows)
+        self.dist = np.frombuffer(self._dist, dtype=np.int32).reshape(rows, cols)
+        self.recomputes = 0
+        self.repairs = 0
+        self.touched = 0  # cells whose distance a repair rewrote
+
+    def _neighbors(self, i: int) -> List[int]:
+        cols = self.cols
+        y, x = divmod(i, cols)
+        out = []
+        if y > 0:
+            out.append(i - cols)
+        if y < self.rows - 1:
+            out.append(i + cols)
+        if x > 0:
+            out.append(i - 1)
+        if x < cols - 1:
+            out.append(i + 1)
+        return out
+
+    def _open(self, i: int) -> bool:
+        return i == self.source or not self.flags[i] & BLOCKING
+
+    def recompute(self, source: Optional[int] = None):
+        """Full BFS from ``source`` (default: the current one, or none)."""
+        if source is not None:
+            self.source = source
+        dist = self._dist
+        dist[:] = array("i", [UNREACHABLE]) * len(dist)
+        self.recomputes += 1
+        if self.source < 0:
+            return
+        dist[self.source] = 0
+        self._lower([self.source])
+
+    def _lower(self, seeds: Iterable[int]):
+        """Spread decreased distances from ``seeds`` while they improve."""
+        dist, flags = self._dist, self.flags
+        queue = deque(seeds)
+        touched = 0
+        while queue:
+            i = queue.popleft()
+            d = dist[i] + 1
+            for j in self._neighbors(i):
+                if d < dist[j] and not flags[j] & BLOCKING:
+                    dist[j] = d
+                    queue.append(j)
+                    touched += 1
+        self.touched += touched
+
+    def _raise(self, start: int):
+        """Invalidate ``start`` and every cell that only had shortest paths
+        through it, then refill them from their valid neighbours."""
+        dist = self._dist
+        if dist[start] == UNREACHABLE:
+            return
+        affected = {start}
+        queue = deque([start])
+        # Breadth-first from start visits cells in increasing distance, so a
+        # cell's possible parents are settled before the cell is checked
+        while queue:
+            i = queue.popleft()
+            d = dist[i] + 1
+            for j in self._neighbors(i):
+                if dist[j] != d or j in affected or j == self.source:
+                    continue
+                supported = False
+                for k in self._neighbors(j):
+                    if dist[k] == d - 1 and k not in affected and self._open(k):
+                        supported = True
+                        break
+                if not supported:
+                    affected.add(j)
+                    queue.append(j)
+
+        for i in affected:
+            dist[i] = UNREACHABLE
+        seeds = []
+        for i in affected:
+            if not self._open(i):
+                continue
+            best = UNREACHABLE
+            for k in self._neighbors(i):
+                if k not in affected and dist[k] < best and self._open(k):
+                    best = dist[k]
+            if best < UNREACHABLE:
+                dist[i] = best + 1
+                seeds.append(i)
+        self.touched += len(affected)
+        self._lower(seeds)
+
+    def block(self, i: int):
+        """Cell ``i`` just became BLOCKING."""
+        self.repairs += 1
+        if i != self.source:
+            self._raise(i)
+
+    def unblock(self, i: int):
+        """Cell ``i`` just stopped being BLOCKING."""
+        self.repairs += 1
+        dist = self._dist
+        best = min(
+            (dist[k] for k in self._neighbors(i) if self._open(k)),
+            default=UNREACHABLE,
+        )
+        if best < UNREACHABLE and best + 1 < dist[i]:
+            dist[i] = best + 1
+            self.touched += 1
+            self._lower([i])
+
+
+class DistanceFields:
+    """Distance-to-food and distance-to-tail fields kept in step with an
+    engine; call update() after every engine.step()."""
+
+    def __init__(self, engine: SnakeEngine):
+        self.engine = engine
+        flags = engine.grid.flags
+        self.food = DistanceField(engine.cols, engine.rows, flags)
+        self.tail = DistanceField(engine.cols, engine.rows, flags)
+        self.recompute()
+
+    def recompute(self):
+        """Rebuild both fields from scratch."""
+        self._sync_state()
+        self.food.recompute(self._food)
+        self.tail.recompute(self._tail)
+
+    def _sync_state(self):
+        engine = self.engine
+        food = engine.food
+        self._food = -1 if food is None else food[1] * engine.cols + food[0]
+        self._head = engine.snake.head_index
+        self._tail = engine.snake.tail_index
+        self._ticks = engine.ticks
+        self._version = engine.obstacles_version
+        self._obstacles = list(engine.obstacles)
+
+    def _add_obstacles(self, cells):
+        self._sync_state()
+        for x, y in cells:
+            i = y * self.engine.cols + x
+            self.food.block(i)
+            self.tail.block(i)
+
+    def update(self):
+        """Repair both fields for what changed since the last call: one
+        tick played, or obstacles added without a move. Anything else (a
+        new game, restore(), skipped ticks) is recomputed from scratch."""
+        engine = self.engine
+        head = engine.snake.head_index
+        still = engine.ticks == self._ticks and head == self._head
+        if engine.obstacles_version != self._version:
+            known = len(self._obstacles)
+            if still and engine.obstacles[:known] == self._obstacles:
+                self._add_obstacles(engine.obstacles[known:])
+            else:
+                self.recompute()
+            return
+        if still:
+            return  # nothing moved (e.g. the game ended)
+        stepped = head in self.food._neighbors(self._head)
+        if engine.ticks != self._ticks + 1 or not stepped:
+            self.recompute()
+            return
+
+        old_tail = self._tail
+        self._sync_state()
+        flags = engine.grid.flags
+        freed = old_tail != self._tail and not flags[old_tail] & BLOCKING
+
+        food = self.food
+        if food.source != self._food:
+            food.recompute(self._food)
+        else:
+            food.block(head)
+            if freed:
+                food.unblock(old_tail)
+
+        tail = self.tail
+        if tail.source != self._tail:
+            tail.recompute(self._tail)
+        else:
+            tail.block(head)
@@ -0,0 +1,352 @@
+"""
+Headless Snake rules engine.
+
+SnakeEngine holds the complete game state (snake, food, obstacles,
+power-ups, score, level, invincibility) and advances it one tick per
+step() call. It has no pygame dependency, so bots, benchmarks and tests
+can run it without a display; app.SnakeGame is a frontend over it.
+snapshot() and restore() copy the whole state in and out of an immutable
+SnakeState for look-ahead search.
+"""
+
+import logging
+import math
+import random
+from typing import List, NamedTuple, Optional, Tuple
+
+from snake_grid import (
+    BLOCKING,
+    FOOD,
+    OBSTACLE,
+    POWER_UP,
+    OccupancyGrid,
+    SnakeBody,
+)
+
+logger = logging.getLogger(__name__)
+
+Cell = Tuple[int, int]
+Direction = Tuple[int, int]
+
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+# Indexed by the 2-bit direction codes used by replays and batch actions
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+
+BASE_SPEED = 10  # ticks per second at level 1
+MAX_OBSTACLES = 20
+POWER_UP_CHANCE = 0.01  # per tick
+_LOG_NO_POWER_UP = math.log(1.0 - POWER_UP_CHANCE)
+INVINCIBILITY_MS = 5000
+POINTS_PER_FOOD = 10
+POINTS_PER_LEVEL = 50
+
+
+class SnakeState(NamedTuple):
+    """Immutable copy of a SnakeEngine's state, taken by snapshot().
+
+    The board arrays (body ring buffer, layer flags, snake counts and the
+    free-cell index) are stored as bytes so that restore() is a handful of
+    memcpys. The obstacle and power-up tuples and the RNG state are shared
+    with the previous snapshot for as long as they are unchanged.
+    """
+
+    cols: int
+    rows: int
+    seed: int
+    arrays: Tuple[bytes, ...]
+    head_ptr: int
+    tail_ptr: int
+    length: int
+    free_count: int
+    direction: Direction
+    food: Optional[Cell]
+    obstacles: Tuple[Cell, ...]
+    power_ups: Tuple[Tuple[int, int, str], ...]
+    score: int
+    high_score: int
+    level: int
+    invincible: bool
+    power_up_timer: int
+    power_up_countdown: int
+    ticks: int
+    game_over: bool
+    rng_state: tuple
+
+
+class SnakeEngine:
+    """Pure-Python Snake simulation with a reset(seed) / step(direction) API."""
+
+    def __init__(
+        self,
+        cols: int = 40,
+        rows: int = 30,
+        seed: Optional[int] = None,
+        max_obstacles: int = MAX_OBSTACLES,
+    ):
+        if cols < 3 or rows < 1:
+            raise ValueError(f"Board too small: {cols}x{rows}")
+        self.cols = cols
+        self.rows = rows
+        self.max_obstacles = max_obstacles
+        self.grid = OccupancyGrid(cols, rows)
+        self.snake = SnakeBody(cols, rows)
+        self.rng = random.Random()
+        self.high_score = 0
+        # Bumped whenever the obstacle layout changes, for cached backgrounds
+        self.obstacles_version = 0
+        # Raw views of every board array, copied by snapshot()/restore()
+        free = self.grid.free
+        self._views = tuple(
+            memoryview(a).cast("B")
+            for a in (
+                self.snake.buf,
+                self.grid.flags,
+                self.grid.snake_count,
+                free.cells,
+                free.pos,
+            )
+        )
+        self.reset(seed)
+
+    def reset(self, seed: Optional[int] = None):
+        """Start a new game. The same seed always produces the same game."""
+        if seed is None:
+            seed = random.SystemRandom().randrange(1 << 32)
+        self.seed = seed
+        self.rng.seed(seed)
+        # Cached immutable parts for snapshot(); None once they change
+        self._rng_state: Optional[tuple] = None
+        self._obstacles_state: Optional[Tuple[Cell, ...]] = None
+        self._power_ups_state: Optional[Tuple[Tuple[int, int, str], ...]] = None
+
+        self.score = 0
+        self.level = 1
+        self.speed = BASE_SPEED
+        self.invincible = False
+        self.power_up_timer = 0  # in milliseconds
+        self.power_ups: List[Tuple[int, int, str]] = []
+        self.ticks = 0
+        self.game_over = False
+
+        self.grid.reset()
+        hx, hy = max(2, min(10, self.cols // 2)), min(10, self.rows // 2)
+        self.snake.reset([(hx, hy), (hx - 1, hy), (hx - 2, hy)])
+        for index in self.snake.indices():
+            self.grid.add_snake_at(index)
+        self.direction: Direction = RIGHT
+        self.obstacles: List[Cell] = []
+        self.food: Optional[Cell] = self.generate_food()
+        if self.food is not None:
+            self.grid.set(self.food, FOOD)
+        self.generate_obstacles()
+        self.power_up_countdown = self._power_up_delay()
+
+    @property
+    def tick_rate(self) -> int:
+        """Logic ticks per second for the current level."""
+        return self.speed + (self.level - 1) * 2
+
+    def generate_food(self) -> Optional[Cell]:
+        """Pick a free cell for food, or None if the board is full."""
+        self._rng_state = None
+        return self.grid.random_free_cell(self.rng)
+
+    def generate_obstacles(self):
+        """Generate obstacles on free cells until the limit or a full board."""
+        self._rng_state = None
+        self._obstacles_state = None
+        self.obstacles_version += 1
+        while len(self.obstacles) < self.max_obstacles:
+            cell = self.grid.random_free_cell(self.rng)
+            if cell is None:
+                logger.info("Board full, stopping obstacle generation.")
+                break
+            self.obstacles.append(cell)
+            self.grid.set(cell, OBSTACLE)
+
+    def _power_up_delay(self) -> int:
+        """Ticks until the next power-up spawn.
+
+        Drawn from a geometric distribution, which is equivalent to rolling
+        POWER_UP_CHANCE every tick but only touches the RNG on a spawn, so
+        snapshots between spawns can share one RNG state.
+        """
+        self._rng_state = None
+        return int(math.log(1.0 - self.rng.random()) / _LOG_NO_POWER_UP) + 1
+
+    def generate_power_up(self):
+        """Count down to the next power-up and spawn it when due."""
+        self.power_up_countdown -= 1
+        if self.power_up_countdown <= 0:
+            self.spawn_power_up()
+            self.power_up_countdown = self._power_up_delay()
+
+    def spawn_power_up(self):
+        """Place a power-up on a free cell, if there is one."""
+        self._rng_state = None
+        cell = self.grid.random_free_cell(self.rng)
+        if cell is not None:
+            self._power_ups_state = None
+            self.power_ups.append((cell[0], cell[1], "invincibility"))
+            self.grid.set(cell, POWER_UP)
+            logger.debug("Power-up generated at %s", cell)
+
+    def turn(self, direction: Direction):
+        """Change heading unless it would reverse into the neck."""
+        dx, dy = self.direction
+        if direction != (-dx, -dy):
+            self.direction = direction
+
+    def step(
+        self, direction: Optional[Direction] = None, dt_ms: Optional[int] = None
+    ) -> bool:
+        """Advance one tick and return True once the game is over.
+
+        ``direction`` is applied through turn() before moving; ``dt_ms`` is
+        the wall time the tick represents for the invincibility timer and
+        defaults to one tick at the current level's rate.
+        """
+        if self.game_over:
+            return True
+        if direction is not None:
+            self.turn(direction)
+
+        grid = self.grid
+        snake = self.snake
+        cols = self.cols
+        head = snake.head_index
+        dx, dy = self.direction
+        x = head % cols + dx
+        y = head // cols + dy
+
+        # Wall collision
+        if not (0 <= x < cols and 0 <= y < self.rows):
+            self.game_over = True
+            return True
+
+        # Self and obstacle collision
+        new_head = y * cols + x
+        flags = grid.flags[new_head]
+        if flags & BLOCKING and not self.invincible:
+            self.game_over = True
+            return True
+
+        # An invincible snake overlapping itself can fill the body buffer;
+        # from then on it keeps its length
+        full = snake.length == snake.capacity
+        if full:
+            grid.remove_snake_at(snake.pop_tail())
+        snake.push_head(new_head)
+        grid.add_snake_at(new_head)
+        self.ticks += 1
+
+        if flags & FOOD:
+            self.score += POINTS_PER_FOOD
+            if self.score > self.high_score:
+                self.high_score = self.score
+            grid.clear_at(new_head, FOOD)
+            self.food = self.generate_food()
+            if self.food is None:
+                logger.info("Board full, nothing left to eat.")
+                self.game_over = True
+                return True
+            grid.set(self.food, FOOD)
+            if self.score % POINTS_PER_LEVEL == 0:
+                self.level += 1
+        elif not full:
+            grid.remove_snake_at(snake.pop_tail())
+
+        if flags & POWER_UP:
+            for pu in self.power_ups:
+                if x == pu[0] and y == pu[1]:
+                    if pu[2] == "invincibility":
+                        self.invincible = True
+                        self.power_up_timer = INVINCIBILITY_MS
+                    self.power_ups.remove(pu)
+                    self._power_ups_state = None
+                    grid.clear_at(new_head, POWER_UP)
+                    break
+
+        if self.invincible:
+            if dt_ms is None:
+                dt_ms = 1000 // self.tick_rate
+            self.power_up_timer -= dt_ms
+            if self.power_up_timer <= 0:
+                self.invincible = False
+                self.power_up_timer = 0
+
+        self.generate_power_up()
+        return False
+
+    def snapshot(self) -> SnakeState:
+        """Capture the full state, including the RNG, as a SnakeState."""
+        if self._rng_state is None:
+            self._rng_state = self.rng.getstate()
+        if self._obstacles_state is None:
+            self._obstacles_state = tuple(self.obstacles)
+        if self._power_ups_state is None:
+            self._power_ups_state = tuple(self.power_ups)
+        snake = self.snake
+        return SnakeState(
+            self.cols,
+            self.rows,
+            self.seed,
+            tuple([view.tobytes() for view in self._views]),
+            snake._head,
+            snake._tail,
+            snake.length,
+            self.grid.free.count,
+            self.direction,
+            self.food,
+            self._obstacles_state,
+            self._power_ups_state,
+            self.score,
+            self.high_score,
+            self.level,
+            self.invincible,
+            self.power_up_timer,
+            self.power_up_countdown,
+            self.ticks,
+            self.game_over,
+            self._rng_state,
+        )
+
+    def restore(self, state: SnakeState):
+        """Return to a snapshot; later steps replay exactly as they did then."""
+        if state.cols != self.cols or state.rows != self.rows:
+            raise ValueError(
+                f"Snapshot is for a {state.cols}x{state.rows} board, "
+                f"not {self.cols}x{self.rows}"
+            )
+        for view, data in zip(self._views, state.arrays):
+            view[:] = data
+        snake = self.snake
+        snake._head = state.head_ptr
+        snake._tail = state.tail_ptr
+        snake.length = state.length
+        self.grid.free.count = state.free_count
+
+        self.seed = state.seed
+        self.direction = state.direction
+        self.food = state.food
+        obstacles = list(state.obstacles)
+        if obstacles != self.obstacles:
+            self.obstacles_version += 1
+        self.obstacles = obstacles
+        self._obstacles_state = state.obstacles
+        self.power_ups = list(state.power_ups)
+        self._power_ups_state = state.power_ups
+        self.score = state.score
+        self.high_score = state.high_score
+        self.level = state.level
+        self.invincible = state.invincible
+        self.power_up_timer = state.power_up_timer
+        self.power_up_countdown = state.power_up_countdown
+        self.ticks = state.ticks
+        self.game_over = state.game_over
+        if state.rng_state is not self._rng_state:
+            self.rng.setstate(state.rng_state)
+            self._rng_state = state.rng_state
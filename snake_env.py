@@ -0,0 +1,233 @@
+"""
+Gymnasium environments for training agents on the Snake rules.
+
+SnakeEnv wraps one headless SnakeEngine; SnakeVectorEnv wraps a SnakeBatch
+so that one step() advances every board in a few NumPy calls. Both write
+observations into a buffer allocated once at construction and return that
+buffer itself (zero-copy): it is overwritten by the next reset() or
+step(), so agents that keep observations around (e.g. a replay buffer)
+must copy them, or pass ``copy=True`` as Gymnasium's own vector
+environments do (its env_checker requires that).
+
+Observations are either ``"grid"``, one uint8 0/1 plane per channel in
+CHANNELS of shape (channels, rows, cols), or ``"features"``, a float32
+vector of FEATURES: danger, current heading and food direction for each of
+up, down, left and right. Actions are indices into snake_engine.DIRECTIONS
+(the snake_batch ACTION_* codes). Eating is worth +1 and dying -1; a full
+board ends the game after the last food. Games still running after
+``max_steps`` ticks are truncated.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+import gymnasium
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import AutoresetMode, VectorEnv
+
+from snake_batch import STEPS, SnakeBatch
+from snake_engine import DIRECTIONS, SnakeEngine
+from snake_grid import BLOCKING, FOOD, OBSTACLE, POWER_UP, SNAKE
+
+CHANNELS = ("body", "head", "food", "obstacle", "power_up")
+FEATURES = tuple(
+    f"{kind}_{name}"
+    for kind in ("danger", "heading", "food")
+    for name in ("up", "down", "left", "right")
+)
+OBS_TYPES = ("grid", "features")
+
+# Grid channels read straight from OccupancyGrid layer flags
+LAYER_PLANES = ((0, SNAKE), (2, FOOD), (3, OBSTACLE), (4, POWER_UP))
+
+
+def observation_space(obs_type: str, cols: int, rows: int) -> spaces.Box:
+    """Observation space of one board."""
+    if obs_type == "grid":
+        return spaces.Box(0, 1, (len(CHANNELS), rows, cols), dtype=np.uint8)
+    if obs_type == "features":
+        return spaces.Box(0.0, 1.0, (len(FEATURES),), dtype=np.float32)
+    raise ValueError(f"Unknown observation type {obs_type!r}; expected {OBS_TYPES}")
+
+
+class SnakeEnv(gymnasium.Env):
+    """Single Snake board with the Gymnasium Env API."""
+
+    metadata: Dict[str, Any] = {"render_modes": []}
+
+    def __init__(
+        self,
+        cols: int = 40,
+        rows: int = 30,
+        obs_type: str = "grid",
+        max_steps: int = 10_000,
+        copy: bool = False,
+    ):
+        self.observation_space = observation_space(obs_type, cols, rows)
+        self.action_space = spaces.Discrete(len(DIRECTIONS))
+        self.obs_type = obs_type
+        self.max_steps = max_steps
+        self.copy = copy
+        self.engine = SnakeEngine(cols, rows)
+        self.cells = cols * rows
+
+        space = self.observation_space
+        self._obs = np.zeros(space.shape, space.dtype)
+        # Writable views of the engine's flags and of the observation planes
+        self._flags = np.frombuffer(self.engine.grid.flags, dtype=np.uint8)
+        if obs_type == "grid":
+            self._planes = self._obs.reshape(-1, self.cells)
+
+    def reset(
+        self, *, seed: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        super().reset(seed=seed)
+        self.engine.reset(int(self.np_random.integers(1 << 32)))
+        return self._observe(), {}
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
+        engine = self.engine
+        score = engine.score
+        terminated = engine.step(DIRECTIONS[action])
+        ate = engine.score > score
+        reward = 1.0 if ate else -1.0 if terminated else 0.0
+        truncated = not terminated and engine.ticks >= self.max_steps
+        info = {"score": engine.score, "won": terminated and engine.food is None}
+        return self._observe(), reward, terminated, truncated, info
+
+    def _observe(self) -> np.ndarray:
+        engine = self.engine
+        head = engine.snake.head_index
+        if self.obs_type == "grid":
+            planes, flags = self._planes, self._flags
+            for plane, layer in LAYER_PLANES:
+                np.bitwise_and(flags, layer, out=planes[plane])
+                np.not_equal(planes[plane], 0, out=planes[plane])
+            planes[1].fill(0)
+            planes[1, head] = 1
+        else:
+            self._features(head)
+        return self._obs.copy() if self.copy else self._obs
+
+    def _features(self, head: int):
+        engine = self.engine
+        obs = self._obs
+        obs.fill(0.0)
+        cols, rows = engine.cols, engine.rows
+        hy, hx = divmod(head, cols)
+        flags = engine.grid.flags
+        for k, (dx, dy) in enumerate(DIRECTIONS):
+            x, y = hx + dx, hy + dy
+            if not (0 <= x < cols and 0 <= y < rows):
+                obs[k] = 1.0
+            elif flags[y * cols + x] & BLOCKING:
+                obs[k] = 1.0
+        obs[4 + DIRECTIONS.index(engine.direction)] = 1.0
+        if engine.food is not None:
+            fx, fy = engine.food
+            obs[8], obs[9] = fy < hy, fy > hy
+            obs[10], obs[11] = fx < hx, fx > hx
+
+
+class SnakeVectorEnv(VectorEnv):
+    """``num_envs`` Snake boards stepped together on one SnakeBatch.
+
+    Finished boards are reset within the same step() (Gymnasium's
+    same-step autoreset), so the returned observation of a finished board
+    is already the first one of its next game; the finished game's score
+    and length are in ``info["final_score"]`` and ``info["final_ticks"]``.
+    """
+
+    metadata: Dict[str, Any] = {"autoreset_mode": AutoresetMode.SAME_STEP}
+
+    def __init__(
+        self,
+        num_envs: int,
+        cols: int = 40,
+        rows: int = 30,
+        obs_type: str = "grid",
+        max_steps: int = 10_000,
+        copy: bool = False,
+    ):
+        self.num_envs = num_envs
+        self.single_observation_space = observation_space(obs_type, cols, rows)
+        self.single_action_space = spaces.Discrete(len(DIRECTIONS))
+        self.observation_space = gymnasium.vector.utils.batch_space(
+            self.single_observation_space, num_envs
+        )
+        self.action_space = spaces.MultiDiscrete(np.full(num_envs, len(DIRECTIONS)))
+        self.obs_type = obs_type
+        self.max_steps = max_steps
+        self.copy = copy
+        self.batch = SnakeBatch(num_envs, cols, rows)
+        self.cells = cols * rows
+
+        space = self.observation_space
+        self._obs = np.zeros(space.shape, space.dtype)
+        if obs_type == "grid":
+            self._planes = self._obs.reshape(num_envs, -1, self.cells)
+        self._boards = np.arange(num_envs)
+
+    def reset(
+        self, *, seed: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        self.batch.reset(seed)
+        return self._observe(), {}
+
+    def step(
+        self, actions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        batch = self.batch
+        ate, terminated = batch.step(actions)
+        # Cut off games that ran too long; terminated boards already restarted
+        truncated = batch.ticks >= self.max_steps
+        batch.end_games(np.flatnonzero(truncated))
+
+        rewards = ate.astype(np.float32)
+        rewards[terminated & ~ate] = -1.0
+        done = terminated | truncated
+        info = {
+            "final_score": np.where(done, batch.final_score, 0),
+            "final_ticks": np.where(done, batch.final_ticks, 0),
+        }
+        return self._observe(), rewards, terminated, truncated, info
+
+    def _observe(self) -> np.ndarray:
+        batch = self.batch
+        heads = batch.heads
+        boards = self._boards
+        if self.obs_type == "grid":
+            planes = self._planes
+            np.greater(batch.snake_count, 0, out=planes[:, 0])
+            planes[:, 1:3].fill(0)
+            planes[boards, 1, heads] = 1
+            fed = np.flatnonzero(batch.food >= 0)
+            planes[fed, 2, batch.food[fed]] = 1
+            np.copyto(planes[:, 3], batch.obstacle)
+            np.copyto(planes[:, 4], batch.power_up)
+        else:
+            self._features(heads)
+        return self._obs.copy() if self.copy else self._obs
+
+    def _features(self, heads: np.ndarray):
+        batch = self.batch
+        boards = self._boards
+        obs = self._obs
+        cols, rows = batch.cols, batch.rows
+        hx, hy = heads % cols, heads // cols
+        for k, (dx, dy) in enumerate(STEPS):
+            x, y = hx + dx, hy + dy
+            wall = (x < 0) | (x >= cols) | (y < 0) | (y >= rows)
+            target = np.clip(y, 0, rows - 1) * cols + np.clip(x, 0, cols - 1)
+            blocked = batch.snake_count[boards, target] > 0
+            blocked |= batch.obstacle[boards, target]
+            np.logical_or(wall, blocked, out=obs[:, k])
+        obs[:, 4:8] = 0.0
+        obs[boards, 4 + batch.direction] = 1.0
+        food = batch.food
+        fy, fx = food // cols, food % cols
+        has_food = food >= 0
+        np.logical_and(has_food, fy < hy, out=obs[:, 8])
+        np.logical_and(has_food, fy > hy, out=obs[:, 9])
+        np.logical_and(has_food, fx < hx, out=obs[:, 10])
+        np.logical_and(has_food, fx > hx, out=obs[:, 11])
@@ -0,0 +1,261 @@
+"""
+Board bookkeeping for the Snake game.
+
+OccupancyGrid stores one byte of layer flags per grid square so that
+collision checks are a single index lookup instead of a scan over the
+snake and obstacle lists. FreeCellIndex tracks the empty squares so the
+spawners can pick one in constant time, and SnakeBody stores the snake as
+flat ``y * cols + x`` cell indices in a fixed-capacity ring buffer.
+"""
+
+import random
+from array import array
+from typing import Iterable, Iterator, Optional, Tuple
+
+Cell = Tuple[int, int]
+
+# Layer flags, one bit each
+SNAKE = 1
+OBSTACLE = 2
+FOOD = 4
+POWER_UP = 8
+
+BLOCKING = SNAKE | OBSTACLE
+
+
+class FreeCellIndex:
+    """Set of free cell indices with O(1) add, discard and uniform sampling.
+
+    ``cells[:count]`` holds the free cells densely packed and ``pos`` maps a
+    cell index to its slot there (-1 when occupied), so a discard swaps the
+    last free cell into the hole instead of shifting the array.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._identity = array("i", range(size))
+        self.cells = array("i", self._identity)
+        self.pos = array("i", self._identity)
+        self.count = size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, index: int) -> bool:
+        return self.pos[index] >= 0
+
+    @property
+    def is_full(self) -> bool:
+        """True when the board has no free cell left."""
+        return self.count == 0
+
+    def add(self, index: int):
+        if self.pos[index] >= 0:
+            return
+        self.cells[self.count] = index
+        self.pos[index] = self.count
+        self.count += 1
+
+    def discard(self, index: int):
+        slot = self.pos[index]
+        if slot < 0:
+            return
+        self.count -= 1
+        last = self.cells[self.count]
+        self.cells[slot] = last
+        self.pos[last] = slot
+        self.cells[self.count] = index
+        self.pos[index] = -1
+
+    def sample(self, rng=random) -> Optional[int]:
+        """Return a uniformly chosen free cell index, or None if full."""
+        if not self.count:
+            return None
+        return self.cells[rng.randrange(self.count)]
+
+    def reset(self):
+        """Mark every cell free again."""
+        self.cells[:] = self._identity
+        self.pos[:] = self._identity
+        self.count = self.size
+
+
+class OccupancyGrid:
+    """Multi-layer occupancy grid, updated incrementally as the game changes."""
+
+    def __init__(self, cols: int, rows: int):
+        self.cols = cols
+        self.rows = rows
+        self.flags = bytearray(cols * rows)
+        # An invincible snake can pass over itself, so segments are counted
+        # per cell and the SNAKE bit is only cleared when the count drops to 0.
+        self._no_snake = array("H", bytes(2 * cols * rows))
+        self.snake_count = array("H", self._no_snake)
+        # Cells with no flag set at all; shared by every spawner
+        self.free = FreeCellIndex(cols * rows)
+
+    @property
+    def is_full(self) -> bool:
+        """True when no cell is free for food, obstacles or power-ups."""
+        return self.free.count == 0
+
+    def random_free_cell(self, rng=random) -> Optional[Cell]:
+        """Sample an empty cell in O(1), or return None if the board is full."""
+        index = self.free.sample(rng)
+        if index is None:
+            return None
+        return (index % self.cols, index // self.cols)
+
+    def in_bounds(self, cell: Cell) -> bool:
+        x, y = cell
+        return 0 <= x < self.cols and 0 <= y < self.rows
+
+    def index(self, cell: Cell) -> int:
+        return cell[1] * self.cols + cell[0]
+
+    def has(self, cell: Cell, layer: int) -> bool:
+        """Return True if any of the given layer bits is set at cell."""
+        return bool(self.flags[cell[1] * self.cols + cell[0]] & layer)
+
+    def is_blocked(self, cell: Cell) -> bool:
+        """Return True if cell holds a snake segment or an obstacle."""
+        return bool(self.flags[cell[1] * self.cols + cell[0]] & BLOCKING)
+
+    def set(self, cell: Cell, layer: int):
+        i = cell[1] * self.cols + cell[0]
+        self.flags[i] |= layer
+        self.free.discard(i)
+
+    def clear(self, cell: Cell, layer: int):
+        self.clear_at(cell[1] * self.cols + cell[0], layer)
+
+    def clear_at(self, i: int, layer: int):
+        """clear() for a flat cell index."""
+        self.flags[i] &= ~layer & 0xFF
+        if not self.flags[i]:
+            self.free.add(i)
+
+    def add_snake(self, cell: Cell):
+        """Mark a new head segment."""
+        self.add_snake_at(cell[1] * self.cols + cell[0])
+
+    def remove_snake(self, cell: Cell):
+        """Unmark a popped tail segment."""
+        self.remove_snake_at(cell[1] * self.cols + cell[0])
+
+    def add_snake_at(self, i: int):
+        """add_snake() for a flat cell index."""
+        self.snake_count[i] += 1
+        self.flags[i] |= SNAKE
+        self.free.discard(i)
+
+    def remove_snake_at(self, i: int):
+        """remove_snake() for a flat cell index."""
+        self.snake_count[i] -= 1
+        if not self.snake_count[i]:
+            self.flags[i] &= ~SNAKE & 0xFF
+            if not self.flags[i]:
+                self.free.add(i)
+
+    def reset(self):
+        """Clear every layer."""
+        self.flags[:] = bytes(len(self.flags))
+        self.snake_count[:] = self._no_snake
+        self.free.reset()
+
+    def rebuild(
+        self,
+        snake: Iterable[Cell],
+        obstacles: Iterable[Cell] = (),
+        food: Optional[Cell] = None,
+        power_ups: Iterable[Tuple[int, int, str]] = (),
+    ):
+        """Recompute all layers from scratch, e.g. after loading a state."""
+        self.reset()
+        for cell in snake:
+            self.add_snake(cell)
+        for cell in obstacles:
+            self.set(cell, OBSTACLE)
+        if food is not None and self.in_bounds(food):
+            self.set(food, FOOD)
+        for pu in power_ups:
+            self.set((pu[0], pu[1]), POWER_UP)
+
+
+class SnakeBody:
+    """Fixed-capacity ring buffer of snake segments, head first.
+
+    Segments are flat cell indices (``y * cols + x``) in an unsigned array;
+    advancing is push_head() plus pop_tail(), both O(1) with no per-tick
+    allocation. Iterating yields ``(x, y)`` cells for drawing and
+    indices() yields the raw indices.
+    """
+
+    def __init__(self, cols: int, rows: int, cells: Iterable[Cell] = ()):
+        self.cols = cols
+        self.capacity = cols * rows
+        typecode = "H" if self.capacity <= 0xFFFF else "I"
+        self.buf = array(typecode, bytes(array(typecode).itemsize * self.capacity))
+        self.reset(cells)
+
+    def reset(self, cells: Iterable[Cell] = ()):
+        """Replace the body with ``cells``, given head first."""
+        self._head = -1
+        self._tail = 0
+        self.length = 0
+        for x, y in reversed(list(cells)):
+            self.push_head(y * self.cols + x)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def push_head(self, index: int):
+        if self.length == self.capacity:
+            raise IndexError("snake body is full")
+        self._head += 1
+        if self._head == self.capacity:
+            self._head = 0
+        self.buf[self._head] = index
+        self.length += 1
+
+    def pop_tail(self) -> int:
+        if not self.length:
+            raise IndexError("pop from empty snake body")
+        index = self.buf[self._tail]
+        self._tail += 1
+        if self._tail == self.capacity:
+            self._tail = 0
+        self.length -= 1
+        return index
+
+    @property
+    def head_index(self) -> int:
+        return self.buf[self._head]
+
+    @property
+    def tail_index(self) -> int:
+        return self.buf[self._tail]
+
+    def index_at(self, k: int) -> int:
+        """Flat index of the k-th segment from the head (negative from tail)."""
+        if k < 0:
+            k += self.length
+        if not 0 <= k < self.length:
+            raise IndexError("snake segment out of range")
+        return self.buf[(self._head - k) % self.capacity]
+
+    def __getitem__(self, k: int) -> Cell:
+        y, x = divmod(self.index_at(k), self.cols)
+        return (x, y)
+
+    def indices(self) -> Iterator[int]:
+        """Flat cell indices from head to tail."""
+        buf, pos, cap = self.buf, self._head, self.capacity
+        for _ in range(self.length):
+            yield buf[pos]
+            pos = pos - 1 if pos else cap - 1
+
+    def __iter__(self) -> Iterator[Cell]:
+        cols = self.cols
+        for index in self.indices():
+            yield (index % cols, index // cols)
@@ -0,0 +1,495 @@
+"""
+Hamiltonian-cycle solver for SnakeEngine.
+
+build_cycle() lays a cycle over the board: a spanning tree of the 2x2
+blocks free of obstacles is traced around (which visits every cell of
+those blocks exactly once), then free cells left over next to obstacles
+or along odd board edges are spliced in two at a time wherever they sit
+alongside a cycle edge. On an empty board with an even side that covers
+every cell; with obstacles, cells that cannot be spliced in stay off the
+cycle.
+
+HamiltonianSolver follows the cycle, so the snake can always fill the
+board, and takes shortcuts towards the food that are safe by
+construction: once the body lies along the cycle in order, the head may
+jump forward to any neighbour that is still strictly ahead of the tail
+and not past the food, which keeps the body in cycle order and leaves
+the head a free cell to move into on every later tick.
+
+Food off the cycle (a cell left over by parity or walled in by
+obstacles) is fetched by an excursion: the head leaves the cycle at one
+cell, walks through off-cycle cells past the food and comes back on at
+a cell further along. The off-cycle cells take over the cycle positions
+skipped in between, so the body stays in cycle order and the same rule
+as for shortcuts keeps the excursion safe. A body that is not in cycle
+order (at the start, or after someone else steered) follows the cycle
+until it is, and only a head off the cycle or a move that would cut off
+the tail is handed to an A* Autopilot detour. Food that no route reaches
+safely within a lap is handed to the detour too, and taken back for
+another lap whenever the detour finds no safe path to it either, so a
+stalled endgame circles the cycle rather than searching every tick.
+"""
+
+from array import array
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+from snake_autopilot import Autopilot, step_direction
+from snake_engine import Direction, SnakeEngine
+from snake_grid import BLOCKING, OBSTACLE
+
+# Shortcuts are only taken while the body covers less of the cycle than this
+SHORTCUT_FILL = 0.5
+
+# Off-cycle cells searched around food that lands off the cycle, and the
+# pocket cells bordering the cycle tried as ways in and out
+MAX_POCKET = 32
+MAX_DOORS = 12
+
+# (entry cell on the cycle, off-cycle cells in walking order, exit cell)
+Route = Tuple[int, List[int], int]
+
+
+def _neighbors(i: int, cols: int, rows: int) -> List[int]:
+    y, x = divmod(i, cols)
+    out = []
+    if y > 0:
+        out.append(i - cols)
+    if y < rows - 1:
+        out.append(i + cols)
+    if x > 0:
+        out.append(i - 1)
+    if x < cols - 1:
+        out.append(i + 1)
+    return out
+
+
+def build_cycle(cols: int, rows: int, flags: bytes) -> array:
+    """Successor of every cell on a Hamiltonian cycle avoiding obstacles.
+
+    Returns an ``array('i')`` of flat indices; cells off the cycle
+    (obstacles and free cells that could not be included) map to -1.
+    """
+    nxt = array("i", [-1]) * (cols * rows)
+    bw, bh = cols // 2, rows // 2
+
+    def corners(bx: int, by: int):
+        tl = 2 * by * cols + 2 * bx
+        return tl, tl + 1, tl + cols, tl + cols + 1  # TL, TR, BL, BR
+
+    usable = [
+        [not any(flags[c] & OBSTACLE for c in corners(bx, by)) for bx in range(bw)]
+        for by in range(bh)
+    ]
+
+    # Largest connected group of usable blocks, as a BFS spanning tree
+    seen = [[False] * bw for _ in range(bh)]
+    best: List = []
+    for by in range(bh):
+        for bx in range(bw):
+            if not usable[by][bx] or seen[by][bx]:
+                continue
+            seen[by][bx] = True
+            blocks = [(bx, by)]
+            edges = []
+            queue = deque(blocks)
+            while queue:
+                x, y = queue.popleft()
+                for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                    if 0 <= nx < bw and 0 <= ny < bh:
+                        if usable[ny][nx] and not seen[ny][nx]:
+                            seen[ny][nx] = True
+                            blocks.append((nx, ny))
+                            edges.append(((x, y), (nx, ny)))
+                            queue.append((nx, ny))
+            if len(blocks) > len(best):
+                best = [blocks, edges]
+    if not best:
+        return nxt
+
+    # Each block alone is a loop TL -> BL -> BR -> TR -> TL; every tree edge
+    # swaps the two facing sides for two crossing edges, joining the loops
+    blocks, edges = best
+    for bx, by in blocks:
+        tl, tr, bl, br = corners(bx, by)
+        nxt[tl], nxt[bl], nxt[br], nxt[tr] = bl, br, tr, tl
+    for a, b in edges:
+        if a[0] > b[0] or a[1] > b[1]:
+            a, b = b, a
+        _, a_tr, a_bl, a_br = corners(*a)
+        b_tl, b_tr, b_bl, _ = corners(*b)
+        if a[1] == b[1]:  # a left of b
+            nxt[a_br], nxt[b_tl] = b_bl, a_tr
+        else:  # a above b
+            nxt[a_bl], nxt[b_tr] = b_tl, a_br
+
+    _splice_leftovers(nxt, cols, rows, flags)
+    return nxt
+
+
+def _splice_leftovers(nxt: array, cols: int, rows: int, flags: bytes):
+    """Insert pairs of adjacent off-cycle free cells c, d next to a cycle
+    edge a -> b running alongside them, as a -> c -> d -> b."""
+    prev = array("i", [-1]) * len(nxt)
+    for a, b in enumerate(nxt):
+        if b >= 0:
+            prev[b] = a
+
+    def open_cell(i: int) -> bool:
+        return nxt[i] < 0 and not flags[i] & OBSTACLE
+
+    changed = True
+    while changed:
+        changed = False
+        for c in range(len(nxt)):
+            if not open_cell(c):
+                continue
+            for d in _neighbors(c, cols, rows):
+                if not open_cell(d):
+                    continue
+                step = d - c
+                for a in _neighbors(c, cols, rows):
+                    if nxt[a] < 0:
+                        continue
+                    # b = a + step sits beside d; a, d and b, c are never
+                    # adjacent to each other, so only a <-> b edges qualify
+                    b = a + step
+                    if nxt[a] == b:  # a -> c -> d -> b
+                        nxt[a], nxt[c], nxt[d] = c, d, b
+                        prev[c], prev[d], prev[b] = a, c, d
+                        break
+                    if prev[a] == b:  # b -> d -> c -> a
+                        nxt[b], nxt[d], nxt[c] = d, c, a
+                        prev[d], prev[c], prev[a] = b, d, c
+                        break
+                else:
+                    continue
+                changed = True
+                break
+
+
+class HamiltonianSolver:
+    """Follows a Hamiltonian cycle with safe shortcuts to fill the board."""
+
+    def __init__(self, engine: SnakeEngine, detour: Optional[Autopilot] = None):
+        self.engine = engine
+        self.detour = detour or Autopilot(engine)
+        self.nxt = array("i")
+        self.order = array("i")  # position of each cell along the cycle
+        # Cycle position held by the body segment in each cell: the order
+        # for cycle cells, the position taken over for excursion cells
+        self.slot = array("i")
+        self.size = 0
+        self._version: Optional[int] = None
+        # The first _aligned body segments from the head are in cycle
+        # order; _anchor is the slot of the last of them
+        self._aligned = 0
+        self._anchor = -1
+        self._expect_head: Optional[int] = None
+        self._excursion: Deque[Tuple[int, int]] = deque()  # (cell, slot) to go
+        self._routes: Tuple[int, List[Route]] = (-1, [])  # food cell, routes
+        # Ticks spent circling without a usable route to the food, and the
+        # food cell given up on and left to the detour (until it finds no
+        # safe path either)
+        self._waiting = 0
+        self._handed = -1
+        self.shortcuts = 0
+        self.excursions = 0
+        self.detours = 0
+
+    def reset(self):
+        """Forget the plan, e.g. after engine.reset() or restore()."""
+        self._expect_head = None
+        self._version = None
+        self.detour.reset()
+
+    def _ensure_cycle(self):
+        engine = self.engine
+        if self._version == engine.obstacles_version:
+            return
+        self.nxt = build_cycle(engine.cols, engine.rows, engine.grid.flags)
+        self.order = array("i", [-1]) * len(self.nxt)
+        start = next((i for i, n in enumerate(self.nxt) if n >= 0), -1)
+        size = 0
+        i = start
+        while i >= 0 and self.order[i] < 0:
+            self.order[i] = size
+            size += 1
+            i = self.nxt[i]
+        self.size = size
+        self.slot = array("i", self.order)
+        self._version = engine.obstacles_version
+        self._expect_head = None
+        self._routes = (-1, [])
+        self._waiting = 0
+
+    @property
+    def missed(self) -> int:
+        """Cells free of obstacles that are not on the cycle."""
+        engine = self.engine
+        return engine.cols * engine.rows - len(engine.obstacles) - self.size
+
+    def next_direction(self) -> Direction:
+        """Heading to apply on the coming tick."""
+        self._ensure_cycle()
+        engine = self.engine
+        head = engine.snake.head_index
+        if head != self._expect_head:
+            # First call, or the snake was steered or restored elsewhere
+            self._excursion.clear()
+            self._measure()
+        move = self._choose(head)
+        if move is not None:
+            self._advance(head, *move)
+            return step_direction(head, move[0])
+
+        self.detours += 1
+        food = engine.food
+        handed = food is not None and food[1] * engine.cols + food[0] == self._handed
+        fallbacks = self.detour.fallbacks
+        direction = self.detour.next_direction()
+        if handed and self.detour.fallbacks > fallbacks:
+            # The detour has no safe path either: take the food back and
+            # circle another lap before asking again, rather than search
+            # on every tick of a stalled endgame
+            self._handed = -1
+            self._waiting = 0
+        y, x = divmod(head, engine.cols)
+        x, y = x + direction[0], y + direction[1]
+        if 0 <= x < engine.cols and 0 <= y < engine.rows:
+            target = y * engine.cols + x
+            self._advance(head, target, self.order[target])
+        return direction
+
+    def _measure(self):
+        """Count the body segments in cycle order from scratch."""
+        size = self.size
+        aligned, anchor = 0, -1
+        first, span = -1, 0
+        for i in self.engine.snake.indices():
+            s = self.order[i]
+            if s < 0:
+                break
+            if aligned:
+                behind = (first - s) % size
+                if behind <= span:
+                    break
+                span = behind
+            else:
+                first = s
+            aligned += 1
+            anchor = s
+        self._aligned, self._anchor = aligned, anchor
+        self._expect_head = self.engine.snake.head_index
+
+    def _advance(self, head: int, cell: int, slot: int):
+        """Track cycle order as the head moves into ``cell`` at ``slot``
+        (-1 for an off-cycle cell outside an excursion)."""
+        here = self.slot[head] if self._aligned else -1
+        if slot < 0 or here < 0:
+            self._aligned, self._anchor = (1, slot) if slot >= 0 else (0, -1)
+        else:
+            snake = self.engine.snake
+            if self._aligned >= snake.length:
+                end = self.slot[snake.tail_index]
+            else:
+                end = self._anchor
+            # Still ahead of the head, counting from the prefix's far end
+            if (slot - end) % self.size > (here - end) % self.size:
+                self._aligned += 1
+            else:
+                self._aligned, self._anchor = 1, slot
+        if self.order[cell] < 0:
+            self.slot[cell] = slot
+        self._expect_head = cell
+
+    def _to_tail(self, here: int) -> int:
+        snake = self.engine.snake
+        if snake.length == 1:
+            return self.size
+        return (self.slot[snake.tail_index] - here) % self.size
+
+    def _choose(self, head: int) -> Optional[Tuple[int, int]]:
+        """(cell, slot) for the head to move into, or None for a detour."""
+        engine = self.engine
+        if self._excursion:
+            cell, slot = self._excursion.popleft()
+            if not engine.grid.flags[cell] & BLOCKING:
+                return cell, slot
+            self._excursion.clear()
+            return None
+        food = engine.food
+        if food is None or self.order[head] < 0:
+            return None
+        goal = food[1] * engine.cols + food[0]
+        if goal == self._handed:
+            return None
+        if self._wins(head, goal):
+            return goal, self.order[goal]
+        if self._aligned < engine.snake.length:
+            cell = self._rejoin(head)
+        elif self.order[goal] < 0:
+            return self._toward_excursion(head, goal)
+        else:
+            cell = self._shortcut(head, goal)
+        return None if cell is None else (cell, self.order[cell])
+
+    def _wins(self, head: int, food: int) -> bool:
+        """Whether eating the adjacent ``food`` wins the game: it is the
+        last free cell, or the one left is next to it (the food respawns
+        there and is eaten next)."""
+        engine = self.engine
+        cols, rows = engine.cols, engine.rows
+        if food not in _neighbors(head, cols, rows):
+            return False
+        free = engine.grid.free
+        if len(free) == 0:
+            return True
+        return len(free) == 1 and free.cells[0] in _neighbors(food, cols, rows)
+
+    def _rejoin(self, head: int) -> Optional[int]:
+        """Next cell on the cycle while the body is still out of cycle
+        order, if the tail stays reachable from it."""
+        n = self.nxt[head]
+        if self.engine.grid.flags[n] & BLOCKING:
+            return None
+        return n if self.detour.tail_reachable(n) else None
+
+    def _shortcut(self, head: int, goal: Optional[int]) -> Optional[int]:
+        """Neighbour furthest along the cycle that stays ahead of the tail
+        and does not pass the cycle cell ``goal`` (no further than the
+        next cell without one); None sends the move to the detour."""
+        engine = self.engine
+        order, size = self.order, self.size
+        here = self.slot[head]
+        to_tail = self._to_tail(here)
+        # Cells skipped by shortcuts stay empty until the tail passes them,
+        # so a long snake keeps to the cycle to close those holes up
+        reach = 1
+        if goal is not None and engine.snake.length < size * SHORTCUT_FILL:
+            reach = (order[goal] - here) % size
+        food = engine.food
+        eat = -1 if food is None else food[1] * engine.cols + food[0]
+        flags = engine.grid.flags
+        best, best_step = None, 0
+        for n in _neighbors(head, engine.cols, engine.rows):
+            if order[n] < 0 or flags[n] & BLOCKING:
+                continue
+            step = (order[n] - here) % size
+            if not 0 < step < to_tail or step > reach:
+                continue
+            # Eating keeps the tail in place; leave a free cell before it
+            if n == eat and to_tail - step < 2:
+                continue
+            if step > best_step:
+                best, best_step = n, step
+        if best is not None and best_step > 1:
+            self.shortcuts += 1
+        return best
+
+    def _toward_excursion(self, head: int, food: int) -> Optional[Tuple[int, int]]:
+        """Next move towards food off the cycle: along the cycle to the
+        entry of the best route that is safe, then into the route. None
+        hands the food to the detour once a whole lap has gone by without
+        a safe route (the way back may be further than the body allows)."""
+        engine = self.engine
+        order, size = self.order, self.size
+        here = self.slot[head]
+        routes = self._routes_to(food)
+        to_tail = self._to_tail(here)
+        flags = engine.grid.flags
+        best = None
+        for entry, cells, exit_ in routes:
+            span = (order[exit_] - order[entry]) % size
+            # The route's cells take the first len(cells) positions after
+            # the entry and the rest are skipped. Eating on the way keeps
+            # the tail still for a tick, so the exit must stay at least a
+            # cell short of where the tail will be
+            skipped = span - len(cells)
+            if skipped < 1 or to_tail < skipped + 2:
+                continue
+            if any(flags[c] & BLOCKING for c in cells):
+                continue
+            ahead = (order[entry] - here) % size
+            if best is None or ahead + skipped < best[0]:
+                best = (ahead + skipped, ahead, entry, cells, exit_)
+        if best is None:
+            # Food in a dead end has no route at all and can only be eaten
+            # last; keep circling rather than die for it
+            self._waiting += 1
+            if routes and self._waiting > size:
+                self._handed = food
+                return None
+            cell = self._shortcut(head, None)
+        elif best[1]:
+            cell = self._shortcut(head, best[2])
+        else:
+            _, _, _, cells, exit_ = best
+            self.excursions += 1
+            self._waiting = 0
+            for k, c in enumerate(cells, 1):
+                self._excursion.append((c, (here + k) % size))
+            self._excursion.append((exit_, order[exit_]))
+            return self._excursion.popleft()
+        return None if cell is None else (cell, order[cell])
+
+    def _routes_to(self, food: int) -> List[Route]:
+        """Routes from the cycle through the off-cycle pocket around
+        ``food`` and back, in both directions; cached per food cell."""
+        if self._routes[0] == food:
+            return self._routes[1]
+        self._waiting = 0
+        engine = self.engine
+        cols, rows = engine.cols, engine.rows
+        order, flags = self.order, engine.grid.flags
+
+        # Off-cycle cells around the food, each with its BFS parent and the
+        # neighbour of the food its path leaves by
+        parent = {food: -1}
+        branch = {food: food}
+        pocket = []
+        queue = deque([food])
+        while queue and len(pocket) < MAX_POCKET:
+            c = queue.popleft()
+            pocket.append(c)
+            for n in _neighbors(c, cols, rows):
+                if n in parent or order[n] >= 0 or flags[n] & OBSTACLE:
+                    continue
+                parent[n] = c
+                branch[n] = n if c == food else branch[c]
+                queue.append(n)
+
+        def trail(c: int) -> List[int]:
+            """Pocket cells from the food to ``c``."""
+            cells = [c]
+            while parent[cells[-1]] >= 0:
+                cells.append(parent[cells[-1]])
+            return cells[::-1]
+
+        # Pocket cells on the cycle's edge and the cycle cells they touch,
+        # nearest the food first
+        doors = [
+            (c, n)
+            for c in pocket
+            for n in _neighbors(c, cols, rows)
+            if order[n] >= 0
+        ][:MAX_DOORS]
+        routes = []
+        for u, entry in doors:
+            for v, exit_ in doors:
+                if entry == exit_:
+                    continue
+                # Paths leaving the food the same way would overlap
+                if food not in (u, v) and branch[u] == branch[v]:
+                    continue
+                cells = trail(u)[::-1] + trail(v)[1:]
+                routes.append((entry, cells, exit_))
+        self._routes = (food, routes)
+        return routes
+
+    def summary(self) -> str:
+        return (
+            f"hamiltonian cycle {self.size} cells ({self.missed} missed)  "
+            f"shortcuts {self.shortcuts} excursions {self.excursions} "
+            f"detours {self.detours}"
+        )
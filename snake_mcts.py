@@ -0,0 +1,320 @@
+"""
+Monte Carlo tree search bot for SnakeEngine.
+
+MctsBot.next_direction() is called once per tick, before step(), like
+Autopilot. It runs UCT simulations from the current position until its
+wall-clock budget (``budget_ms``) is spent, so it is anytime: a short
+budget still returns the best move found so far. Simulations play moves
+on a private scratch engine with snapshot()/restore(), expand one new
+position, and score it with a short rollout that steers towards the food
+(+1 per food, -1 for dying, discounted per tick).
+
+Positions are keyed by a Zobrist hash of the body cells, head, tail,
+food and heading, updated incrementally as each simulated move is
+applied, so a position reached by different move orders is searched
+once. Nodes live in a transposition table that evicts the least recently
+used ones. Each node holds a full snapshot of the board, so the table is
+bounded by the snapshot bytes (``max_bytes``) as well as by
+``max_nodes``: large boards get fewer nodes. The table outlives the
+tick: next tick's root hash is advanced from this tick's by the step the
+engine actually took (and recomputed from scratch only after a reset or
+restore), so the subtree under the move played keeps its statistics.
+Power-ups, the score and the RNG are not part of the hash; positions
+that differ only in those share a node.
+"""
+
+import math
+import random
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from snake_engine import DIRECTIONS, Direction, SnakeEngine, SnakeState
+from snake_grid import BLOCKING
+
+# Checked against the deadline every this many rollout steps
+_CHECK_EVERY = 16
+
+
+class Zobrist:
+    """Random 64-bit keys per cell for each board feature."""
+
+    def __init__(self, cols: int, rows: int, seed: int = 0):
+        rng = random.Random(seed)
+        cells = cols * rows
+        self.cols = cols
+        self.body = [rng.getrandbits(64) for _ in range(cells)]
+        self.head = [rng.getrandbits(64) for _ in range(cells)]
+        self.tail = [rng.getrandbits(64) for _ in range(cells)]
+        # One extra slot for "no food"
+        self.food = [rng.getrandbits(64) for _ in range(cells + 1)]
+        self.heading = {d: rng.getrandbits(64) for d in DIRECTIONS}
+        self.dead = rng.getrandbits(64)
+
+    def food_index(self, food: Optional[Tuple[int, int]]) -> int:
+        return len(self.food) - 1 if food is None else food[1] * self.cols + food[0]
+
+    def key(self, engine: SnakeEngine) -> int:
+        """Hash of the engine's position, computed from scratch."""
+        key = 0
+        for i in engine.snake.indices():
+            key ^= self.body[i]
+        snake = engine.snake
+        key ^= self.head[snake.head_index] ^ self.tail[snake.tail_index]
+        key ^= self.food[self.food_index(engine.food)]
+        return key ^ self.heading[engine.direction]
+
+    @staticmethod
+    def mark(engine: SnakeEngine) -> Tuple:
+        """What advance() needs to know about the position before a step."""
+        snake = engine.snake
+        return (
+            snake.head_index,
+            snake.tail_index,
+            engine.food,
+            engine.direction,
+            engine.score,
+        )
+
+    def advance(self, key: int, mark: Tuple, engine: SnakeEngine) -> int:
+        """Hash after one non-fatal step from the position ``mark``ed with
+        hash ``key``."""
+        old_head, old_tail, old_food, old_dir, score = mark
+        snake = engine.snake
+        new_head, new_tail = snake.head_index, snake.tail_index
+        key ^= self.body[new_head] ^ self.head[old_head] ^ self.head[new_head]
+        key ^= self.tail[old_tail] ^ self.tail[new_tail]
+        key ^= self.heading[old_dir] ^ self.heading[engine.direction]
+        if engine.score > score:
+            food = self.food
+            key ^= food[self.food_index(old_food)] ^ food[self.food_index(engine.food)]
+        else:
+            key ^= self.body[old_tail]
+        return key
+
+
+class Node:
+    """Search statistics for one position."""
+
+    __slots__ = ("state", "visits", "value", "untried", "children", "rewards")
+
+    def __init__(self, state: SnakeState, actions: List[Direction]):
+        self.state = state
+        self.visits = 0
+        self.value = 0.0  # sum of discounted returns from this position
+        self.untried = actions
+        self.children: Dict[Direction, int] = {}  # heading -> child key
+        self.rewards: Dict[Direction, float] = {}  # heading -> reward on entry
+
+
+class MctsBot:
+    """Picks a heading for every tick of a SnakeEngine game by UCT search."""
+
+    def __init__(
+        self,
+        engine: SnakeEngine,
+        budget_ms: float = 5.0,
+        max_nodes: int = 5000,
+        max_bytes: int = 128 << 20,
+        rollout_depth: int = 20,
+        exploration: float = 1.0,
+        discount: float = 0.95,
+        seed: int = 0,
+    ):
+        self.engine = engine
+        self.budget_ms = budget_ms
+        # Room for at least the root and one child
+        state_bytes = sum(map(len, engine.snapshot().arrays))
+        self.max_nodes = max(2, min(max_nodes, max_bytes // state_bytes))
+        self.rollout_depth = rollout_depth
+        self.exploration = exploration
+        self.discount = discount
+        self.rng = random.Random(seed)
+        self.zobrist = Zobrist(engine.cols, engine.rows, seed)
+        # Scratch engine the simulations are played on
+        self.sim = SnakeEngine(engine.cols, engine.rows, engine.seed)
+        # Transposition table, least recently used first
+        self.table: "OrderedDict[int, Node]" = OrderedDict()
+        # (ticks, key, mark) of the last root, to hash the next one from
+        self._root: Optional[Tuple[int, int, Tuple]] = None
+
+        self.simulations = 0
+        self.reused = 0  # ticks whose root was already in the table
+        self.evictions = 0
+        self.last_simulations = 0
+
+    def reset(self):
+        """Drop the table, e.g. after engine.reset() or restore()."""
+        self.table.clear()
+        self._root = None
+
+    def next_direction(self) -> Direction:
+        """Heading to apply on the coming tick."""
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        engine = self.engine
+        if engine.game_over:
+            return engine.direction
+        key = self._root_key()
+        self._root = (engine.ticks, key, Zobrist.mark(engine))
+        root = self._lookup(key)
+        if root is None:
+            root = self._store(key, engine.snapshot())
+        else:
+            self.reused += 1
+
+        simulations = 0
+        table = self.table
+        while True:
+            # Keep the root from being evicted by its own search
+            table.move_to_end(key)
+            self._simulate(key, root, deadline)
+            simulations += 1
+            if time.perf_counter() > deadline:
+                break
+        self.simulations += simulations
+        self.last_simulations = simulations
+
+        if not root.children:
+            return engine.direction
+        return max(root.children, key=lambda d: self._child_visits(root, d))
+
+    def _root_key(self) -> int:
+        """Hash of the engine's position, advanced from the last root when
+        the engine has taken exactly one step since."""
+        engine, last = self.engine, self._root
+        if last is not None and engine.ticks == last[0] + 1:
+            return self.zobrist.advance(last[1], last[2], engine)
+        return self.zobrist.key(engine)
+
+    def _child_visits(self, node: Node, action: Direction) -> int:
+        child = self.table.get(node.children[action])
+        return child.visits if child else 0
+
+    def _lookup(self, key: int) -> Optional[Node]:
+        node = self.table.get(key)
+        if node is not None:
+            self.table.move_to_end(key)
+        return node
+
+    def _store(self, key: int, state: SnakeState) -> Node:
+        dx, dy = state.direction
+        actions = [d for d in DIRECTIONS if d != (-dx, -dy)]
+        if state.game_over:
+            actions = []
+        node = Node(state, actions)
+        self.table[key] = node
+        while len(self.table) > self.max_nodes:
+            self.table.popitem(last=False)
+            self.evictions += 1
+        return node
+
+    def _apply(self, key: int, action: Direction) -> Tuple[int, float]:
+        """Step the scratch engine; returns (new key, reward)."""
+        sim, z = self.sim, self.zobrist
+        mark = Zobrist.mark(sim)
+        if sim.step(action):
+            # Keyed per move, so separate deaths (or a death and a win)
+            # do not pool their visits in one child
+            won = sim.food is None
+            return key ^ z.dead ^ z.heading[action], 1.0 if won else -1.0
+        return z.advance(key, mark, sim), 1.0 if sim.score > mark[4] else 0.0
+
+    def _simulate(self, key: int, node: Node, deadline: float):
+        """Select, expand one position, roll out and back up."""
+        path: List[Tuple[Node, float]] = []
+        # A snake circling a loop longer than itself repeats positions
+        seen = {key}
+        repeated = False
+        while not node.untried and node.children:
+            action = self._select(node)
+            child_key = node.children[action]
+            child = self._lookup(child_key)
+            if child is None:
+                # Evicted: expand it again
+                del node.children[action]
+                node.untried.append(action)
+                break
+            path.append((node, node.rewards[action]))
+            node, key = child, child_key
+            if key in seen:
+                repeated = True
+                break
+            seen.add(key)
+
+        value = 0.0
+        if node.untried and not repeated:
+            action = node.untried.pop(self.rng.randrange(len(node.untried)))
+            self.sim.restore(node.state)
+            child_key, reward = self._apply(key, action)
+            child = self._lookup(child_key)
+            if child is None:
+                child = self._store(child_key, self.sim.snapshot())
+            node.children[action] = child_key
+            node.rewards[action] = reward
+            path.append((node, reward))
+            node = child
+            if not self.sim.game_over:
+                value = self._rollout(deadline)
+
+        node.visits += 1
+        node.value += value
+        for parent, reward in reversed(path):
+            value = reward + self.discount * value
+            parent.visits += 1
+            parent.value += value
+
+    def _select(self, node: Node) -> Direction:
+        """UCT choice among the expanded moves of ``node``."""
+        log_n = math.log(node.visits + 1)
+        best, best_score = None, -math.inf
+        for action, child_key in node.children.items():
+            child = self.table.get(child_key)
+            if child is None or not child.visits:
+                return action
+            q = node.rewards[action] + self.discount * child.value / child.visits
+            score = q + self.exploration * math.sqrt(log_n / child.visits)
+            if score > best_score:
+                best, best_score = action, score
+        return best
+
+    def _rollout(self, deadline: float) -> float:
+        """Discounted return of a short food-seeking playout on the scratch
+        engine, from wherever it was left."""
+        sim = self.sim
+        cols, rows = sim.cols, sim.rows
+        flags = sim.grid.flags
+        rng = self.rng
+        total, weight = 0.0, 1.0
+        for depth in range(self.rollout_depth):
+            if depth % _CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                break
+            head = sim.snake.head_index
+            y, x = divmod(head, cols)
+            food = sim.food
+            moves = []
+            for d in DIRECTIONS:
+                nx, ny = x + d[0], y + d[1]
+                if 0 <= nx < cols and 0 <= ny < rows:
+                    if not flags[ny * cols + nx] & BLOCKING:
+                        moves.append((nx, ny, d))
+            if not moves:
+                return total - weight
+            if food is not None and rng.random() < 0.7:
+                fx, fy = food
+                move = min(moves, key=lambda m: abs(m[0] - fx) + abs(m[1] - fy))
+            else:
+                move = rng.choice(moves)
+            score = sim.score
+            if sim.step(move[2]):
+                return total + weight * (1.0 if sim.food is None else -1.0)
+            if sim.score > score:
+                total += weight
+            weight *= self.discount
+        return total
+
+    def summary(self) -> str:
+        return (
+            f"mcts {self.last_simulations} sims/tick  "
+            f"table {len(self.table)}/{self.max_nodes} "
+            f"reused {self.reused} evictions {self.evictions}"
+        )
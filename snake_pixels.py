@@ -0,0 +1,103 @@
+"""
+Pixel-array renderer for huge boards drawn at 1-4 px per cell.
+
+At these sizes per-cell blits are hopeless: a 1000x1000 board has a
+million cells. PixelRenderer instead views the occupancy grid's flag
+bytes as a NumPy array, maps the visible part through a 256-entry palette
+of display-format pixel values into a preallocated one-pixel-per-cell
+buffer, copies that into a Surface with pygame.surfarray.blit_array() and
+scales it to the window with a single pygame.transform.scale(). Every
+frame is a full repaint; the HUD is blitted on top.
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+from snake_engine import SnakeEngine
+from snake_render import BACKGROUND_COLOR, HudText, SnakeRenderer, cell_color
+from snake_view import Camera
+
+# Largest cell size the pixel renderer is used for
+MAX_PIXEL_CELL_SIZE = 4
+
+
+def palette(surface: pygame.Surface) -> np.ndarray:
+    """Pixel value in ``surface``'s format for every grid flag byte."""
+    colors = np.empty(256, dtype=np.uint32)
+    colors[0] = surface.map_rgb(BACKGROUND_COLOR)
+    for f in range(1, 256):
+        colors[f] = surface.map_rgb(cell_color(f))
+    return colors
+
+
+class PixelRenderer(SnakeRenderer):
+    """SnakeRenderer drop-in that draws the board as one scaled pixel array."""
+
+    def __init__(
+        self,
+        screen: pygame.Surface,
+        engine: SnakeEngine,
+        camera: Camera,
+        cell_size: int,
+    ):
+        super().__init__(screen, engine, camera, cell_size)
+        self.palette = palette(screen)
+        # Zero-copy (cols, rows) view of the grid's flag bytes, x-major like
+        # pygame.surfarray
+        self.cells = np.frombuffer(engine.grid.flags, dtype=np.uint8).reshape(
+            engine.rows, engine.cols
+        ).T
+        self._pixels: Optional[np.ndarray] = None
+        self._small: Optional[pygame.Surface] = None
+        self._scaled: Optional[pygame.Surface] = None
+
+    def _buffers(self, width: int, height: int) -> np.ndarray:
+        """(width, height) pixel buffer, reallocated with the surfaces on resize."""
+        pixels = self._pixels
+        if pixels is None or pixels.shape != (width, height):
+            pixels = self._pixels = np.empty((width, height), dtype=np.uint32)
+            screen = self.screen
+            self._small = pygame.Surface((width, height), 0, screen)
+            cell = self.cell_size
+            if cell > 1:
+                size = (width * cell, height * cell)
+                self._scaled = pygame.Surface(size, 0, screen)
+            else:
+                self._scaled = None
+        return pixels
+
+    def draw(
+        self,
+        head_pos: Tuple[float, float],
+        tail_pos: Optional[Tuple[float, float]],
+        hud: List[HudText],
+    ):
+        """Draw one frame and present it.
+
+        At a few pixels per cell the sub-cell head and tail motion is
+        invisible, so the board is drawn as of the current tick.
+        """
+        camera = self.camera
+        camera.follow(*head_pos)
+        x0, y0, x1, y1 = camera.visible_range()
+        pixels = self._buffers(x1 - x0, y1 - y0)
+        np.take(self.palette, self.cells[x0:x1, y0:y1], out=pixels)
+        pygame.surfarray.blit_array(self._small, pixels)
+
+        board = self._small
+        if self._scaled is not None:
+            pygame.transform.scale(board, self._scaled.get_size(), self._scaled)
+            board = self._scaled
+        screen = self.screen
+        screen.fill(BACKGROUND_COLOR)
+        screen.blit(board, camera.to_screen(x0, y0))
+
+        self._hud = list(hud)
+        self._hud_blits = self._render_hud(hud)
+        screen.blits(self._hud_blits, doreturn=False)
+        pygame.display.flip()
+        self.full_repaint = False
+        self.full_repaints += 1
+        self.dirty_rect_count = 1
@@ -0,0 +1,288 @@
+"""
+Q-learning trainers for Snake policies on SnakeVectorEnv.
+
+Agents see the ``"features"`` observation of snake_env (danger, heading
+and food direction for each of the four directions) and learn action
+values for the four DIRECTIONS:
+
+- TabularQ packs an observation into one of STATES compact state codes
+  (4 danger bits x 4 headings x 3 vertical x 3 horizontal food
+  positions) and keeps a (STATES, 4) float32 NumPy Q-table.
+- LinearQ approximates Q(s, a) as a dot product of the features plus a
+  bias with one weight column per action.
+
+QTrainer plays epsilon-greedy on a SnakeVectorEnv, so every step()
+yields one transition per board. Transitions go into ExperienceRing, a
+replay buffer of fixed capacity whose arrays are allocated once, and
+each step trains on one batch sampled from it. Both agents update the
+whole batch in a few vectorized NumPy operations: TabularQ with
+np.add.at, stepping each repeated state by its mean error, and LinearQ
+with one semi-gradient matrix product. Truncated games are treated like
+finished ones (no bootstrap), since same-step autoreset has already
+replaced their next observation.
+"""
+
+import time
+from typing import Dict, List, Tuple, Type
+
+import numpy as np
+
+from snake_engine import DIRECTIONS
+from snake_env import FEATURES, SnakeVectorEnv
+
+ACTIONS = len(DIRECTIONS)
+STATES = 16 * 4 * 3 * 3
+
+# Weights of the danger bits in a state code
+_DANGER_BITS = np.array([1, 2, 4, 8], dtype=np.int64)
+
+
+def encode_states(obs: np.ndarray) -> np.ndarray:
+    """State code in range(STATES) of each row of feature observations."""
+    danger = (obs[:, 0:4] > 0) @ _DANGER_BITS
+    heading = np.argmax(obs[:, 4:8], axis=1)
+    # 0 level, 1 above, 2 below; 0 in line, 1 left, 2 right
+    food_y = (obs[:, 8] > 0) + 2 * (obs[:, 9] > 0)
+    food_x = (obs[:, 10] > 0) + 2 * (obs[:, 11] > 0)
+    return danger + 16 * (heading + 4 * (food_y + 3 * food_x))
+
+
+class ExperienceRing:
+    """Fixed-capacity replay buffer of transitions, oldest overwritten
+    first. sample() fills preallocated batch arrays and returns them, so
+    a batch is only valid until the next sample()."""
+
+    def __init__(self, capacity: int, obs_dim: int, batch_size: int):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.obs = np.zeros((capacity, obs_dim), dtype=np.float32)
+        self.next_obs = np.zeros((capacity, obs_dim), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.size = 0
+        self.pos = 0
+
+        self._index = np.zeros(batch_size, dtype=np.int64)
+        self._batch = (
+            np.zeros((batch_size, obs_dim), dtype=np.float32),
+            np.zeros(batch_size, dtype=np.int64),
+            np.zeros(batch_size, dtype=np.float32),
+            np.zeros((batch_size, obs_dim), dtype=np.float32),
+            np.zeros(batch_size, dtype=bool),
+        )
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(
+        self,
+        obs: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_obs: np.ndarray,
+        dones: np.ndarray,
+    ):
+        """Append one transition per row."""
+        n = len(actions)
+        rows = (self.pos + np.arange(n)) % self.capacity
+        self.obs[rows] = obs
+        self.actions[rows] = actions
+        self.rewards[rows] = rewards
+        self.next_obs[rows] = next_obs
+        self.dones[rows] = dones
+        self.pos = (self.pos + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def sample(
+        self, rng: np.random.Generator
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Uniform random batch of (obs, actions, rewards, next_obs, dones)."""
+        index = self._index
+        index[:] = rng.integers(0, self.size, self.batch_size)
+        obs, actions, rewards, next_obs, dones = self._batch
+        np.take(self.obs, index, axis=0, out=obs)
+        np.take(self.actions, index, out=actions)
+        np.take(self.rewards, index, out=rewards)
+        np.take(self.next_obs, index, axis=0, out=next_obs)
+        np.take(self.dones, index, out=dones)
+        return self._batch
+
+
+class TabularQ:
+    """Q-table over encode_states() codes."""
+
+    name = "tabular"
+
+    def __init__(self, lr: float = 0.1, discount: float = 0.9):
+        self.lr = lr
+        self.discount = discount
+        self.table = np.zeros((STATES, ACTIONS), dtype=np.float32)
+
+    def values(self, obs: np.ndarray) -> np.ndarray:
+        """(n, ACTIONS) action values of n observations."""
+        return self.table[encode_states(obs)]
+
+    def update(self, obs, actions, rewards, next_obs, dones) -> float:
+        """One Q-learning step on a batch; returns the mean |TD error|."""
+        table = self.table
+        states = encode_states(obs)
+        best_next = table[encode_states(next_obs)].max(axis=1)
+        targets = rewards + self.discount * np.where(dones, 0.0, best_next)
+        td = targets - table[states, actions]
+        # Step each (state, action) once by its mean error, so repeats in
+        # a batch do not multiply the learning rate
+        td_sum = np.zeros_like(table)
+        counts = np.zeros_like(table)
+        np.add.at(td_sum, (states, actions), td)
+        np.add.at(counts, (states, actions), 1.0)
+        seen = counts > 0
+        table[seen] += self.lr * td_sum[seen] / counts[seen]
+        return float(np.abs(td).mean())
+
+
+class LinearQ:
+    """Linear action values: Q(s, a) = [features(s), 1] . weights[:, a]."""
+
+    name = "linear"
+
+    def __init__(self, lr: float = 0.05, discount: float = 0.9):
+        self.lr = lr
+        self.discount = discount
+        self.weights = np.zeros((len(FEATURES) + 1, ACTIONS), dtype=np.float32)
+
+    def _inputs(self, obs: np.ndarray) -> np.ndarray:
+        return np.hstack([obs, np.ones((len(obs), 1), dtype=np.float32)])
+
+    def values(self, obs: np.ndarray) -> np.ndarray:
+        """(n, ACTIONS) action values of n observations."""
+        return self._inputs(obs) @ self.weights
+
+    def update(self, obs, actions, rewards, next_obs, dones) -> float:
+        """One semi-gradient Q-learning step on a batch; returns the mean
+        |TD error|."""
+        x = self._inputs(obs)
+        rows = np.arange(len(actions))
+        best_next = (self._inputs(next_obs) @ self.weights).max(axis=1)
+        targets = rewards + self.discount * np.where(dones, 0.0, best_next)
+        td = targets - (x @ self.weights)[rows, actions]
+        # Only the weights of the action taken see each sample's error
+        grad = np.zeros((len(actions), ACTIONS), dtype=np.float32)
+        grad[rows, actions] = td
+        self.weights += (self.lr / len(actions)) * (x.T @ grad)
+        return float(np.abs(td).mean())
+
+
+AGENTS: Dict[str, Type] = {"tabular": TabularQ, "linear": LinearQ}
+
+
+class QTrainer:
+    """Epsilon-greedy Q-learning with experience replay on a vector env.
+
+    Epsilon falls linearly from ``epsilon_start`` to ``epsilon_end`` over
+    the first ``explore_episodes`` finished games.
+    """
+
+    def __init__(
+        self,
+        agent,
+        num_envs: int = 64,
+        cols: int = 20,
+        rows: int = 20,
+        capacity: int = 1 << 17,
+        batch_size: int = 512,
+        epsilon_start: float = 1.0,
+        epsilon_end: float = 0.01,
+        explore_episodes: int = 2000,
+        max_steps: int = 2000,
+        seed: int = 0,
+    ):
+        self.agent = agent
+        self.env = SnakeVectorEnv(
+            num_envs, cols, rows, obs_type="features", max_steps=max_steps
+        )
+        self.ring = ExperienceRing(capacity, len(FEATURES), batch_size)
+        self.epsilon_start = epsilon_start
+        self.epsilon_end = epsilon_end
+        self.explore_episodes = explore_episodes
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+        self.episodes = 0
+        self.steps = 0  # transitions, one per board per env step
+        self.updates = 0
+        self.train_time = 0.0
+        self.last_td = 0.0
+        self.recent_score = 0.0  # mean score of the last reported window
+
+    @property
+    def epsilon(self) -> float:
+        frac = min(self.episodes / max(self.explore_episodes, 1), 1.0)
+        return self.epsilon_start + frac * (self.epsilon_end - self.epsilon_start)
+
+    def act(self, obs: np.ndarray, epsilon: float) -> np.ndarray:
+        """Epsilon-greedy action for every board."""
+        actions = np.argmax(self.agent.values(obs), axis=1)
+        explore = self.rng.random(len(actions)) < epsilon
+        actions[explore] = self.rng.integers(0, ACTIONS, int(explore.sum()))
+        return actions
+
+    def train(self, episodes: int, report_every: int = 250) -> List[Tuple[int, float]]:
+        """Play until ``episodes`` more games have finished, learning from
+        replayed batches. Returns the learning curve as (episodes so far,
+        mean score of the games in that window) points."""
+        env, ring, agent = self.env, self.ring, self.agent
+        obs, _ = env.reset(seed=self.seed + self.episodes)
+        prev = obs.copy()
+        goal = self.episodes + episodes
+        curve = []
+        window: List[np.ndarray] = []
+        window_games = 0
+        start = time.perf_counter()
+        while self.episodes < goal:
+            actions = self.act(prev, self.epsilon)
+            obs, rewards, terminated, truncated, info = env.step(actions)
+            dones = terminated | truncated
+            ring.push(prev, actions, rewards, obs, dones)
+            np.copyto(prev, obs)
+            self.steps += len(actions)
+
+            if len(ring) >= ring.batch_size:
+                self.last_td = agent.update(*ring.sample(self.rng))
+                self.updates += 1
+
+            finished = np.flatnonzero(dones)
+            if finished.size:
+                window.append(info["final_score"][finished])
+                window_games += finished.size
+                self.episodes += finished.size
+                if window_games >= report_every:
+                    self.recent_score = float(np.concatenate(window).mean())
+                    curve.append((self.episodes, self.recent_score))
+                    window, window_games = [], 0
+        self.train_time += time.perf_counter() - start
+        return curve
+
+    def evaluate(self, episodes: int = 200) -> float:
+        """Mean score of greedy play (no exploration, no learning)."""
+        env = self.env
+        obs, _ = env.reset(seed=self.seed + 1_000_000)
+        scores: List[np.ndarray] = []
+        played = 0
+        while played < episodes:
+            obs, _, terminated, truncated, info = env.step(self.act(obs, 0.0))
+            finished = np.flatnonzero(terminated | truncated)
+            scores.append(info["final_score"][finished])
+            played += finished.size
+        return float(np.concatenate(scores)[:episodes].mean())
+
+    @property
+    def episodes_per_sec(self) -> float:
+        return self.episodes / self.train_time if self.train_time else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"qlearn {self.agent.name} {self.episodes} episodes "
+            f"{self.episodes_per_sec:.0f} eps/s  epsilon {self.epsilon:.2f} "
+            f"score {self.recent_score:.1f} td {self.last_td:.3f}"
+        )
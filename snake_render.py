@@ -0,0 +1,368 @@
+"""
+Board renderer for the pygame Snake frontend.
+
+SnakeRenderer draws the on-screen part of the occupancy grid, the
+interpolated head and tail, and the HUD.
+
+Cells are blitted from a display-format sprite atlas in one
+Surface.blits() call per frame. Obstacles, grid lines and the board
+border are baked into a background surface that is rebuilt only when the
+obstacle layout changes, so every repaint starts with one blit of it.
+
+After a full repaint the renderer keeps a copy of the flag bytes it drew
+for each visible row. On later frames it diffs the grid against that
+copy, repaints only the cells that changed (plus the ones under the
+moving head/tail and any HUD text that changed) and hands just those
+rectangles to pygame.display.update(). A full repaint happens on the
+first frame, whenever the camera scrolls, and after invalidate() (window
+resize or expose, game over).
+"""
+
+from typing import List, NamedTuple, Optional, Set, Tuple
+
+import pygame
+
+from snake_engine import SnakeEngine
+from snake_grid import OBSTACLE, POWER_UP, SNAKE
+from snake_view import Camera, visible_cells
+from text_cache import TextCache, get_font
+
+BACKGROUND_COLOR = (0, 0, 0)
+GRID_COLOR = (24, 24, 24)
+BORDER_COLOR = (60, 60, 60)
+SNAKE_COLOR = (0, 255, 0)
+FOOD_COLOR = (255, 0, 0)
+OBSTACLE_COLOR = (100, 100, 100)
+POWER_UP_COLOR = (0, 255, 255)
+POWER_UP_BORDER_COLOR = (255, 255, 255)
+
+# Boards up to this many pixels get a background covering the whole board;
+# larger ones are baked for the visible range and rebaked as it scrolls.
+MAX_BACKGROUND_PIXELS = 4_000_000
+
+
+def cell_color(flags: int) -> Tuple[int, int, int]:
+    """Colour of an occupied cell: snake over power-up over obstacle over food."""
+    if flags & SNAKE:
+        return SNAKE_COLOR
+    if flags & POWER_UP:
+        return POWER_UP_COLOR
+    if flags & OBSTACLE:
+        return OBSTACLE_COLOR
+    return FOOD_COLOR
+
+
+def blit_all(surface: pygame.Surface, sequence):
+    """Blit (source, dest) pairs in one call, with fblits() where available."""
+    if hasattr(surface, "fblits"):
+        surface.fblits(sequence)
+    else:
+        surface.blits(sequence, doreturn=False)
+
+
+class CellAtlas:
+    """Snake, food, obstacle and power-up sprites in one converted surface."""
+
+    def __init__(self, cell_size: int, borders: bool = True):
+        colors = (SNAKE_COLOR, FOOD_COLOR, OBSTACLE_COLOR, POWER_UP_COLOR)
+        surf = pygame.Surface((cell_size * len(colors), cell_size))
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert()
+        sprites = {}
+        for i, color in enumerate(colors):
+            rect = pygame.Rect(i * cell_size, 0, cell_size, cell_size)
+            surf.fill(color, rect)
+            if borders and color == POWER_UP_COLOR and cell_size > 2:
+                pygame.draw.rect(surf, POWER_UP_BORDER_COLOR, rect, 1)
+            sprites[color] = surf.subsurface(rect)
+        self.surface = surf
+        self.snake = sprites[SNAKE_COLOR]
+        # by_flags[f] is the sprite for a cell with grid flags f; None for
+        # empty cells and bare obstacles, which are on the background layer
+        self.by_flags: List[Optional[pygame.Surface]] = [None] * 256
+        for f in range(1, 256):
+            if f != OBSTACLE:
+                self.by_flags[f] = sprites[cell_color(f)]
+
+
+class HudText(NamedTuple):
+    """One line of HUD text; ``pos`` is the top-right corner when ``right``."""
+
+    text: str
+    color: Tuple[int, int, int]
+    pos: Tuple[int, int]
+    size: int = 36
+    right: bool = False
+
+
+class SnakeRenderer:
+    """Dirty-rectangle renderer for a SnakeEngine board."""
+
+    def __init__(
+        self,
+        screen: pygame.Surface,
+        engine: SnakeEngine,
+        camera: Camera,
+        cell_size: int,
+    ):
+        self.screen = screen
+        self.engine = engine
+        self.camera = camera
+        self.cell_size = cell_size
+        self.text_cache = TextCache()
+        self.cell_borders = True
+        self.atlas = CellAtlas(cell_size)
+
+        self.full_repaint = True
+        self.full_repaints = 0
+        self.dirty_rect_count = 0  # rectangles passed to the last update
+        self._view: Optional[Tuple[int, int, int, int, int, int]] = None
+        self._rows: List[bytes] = []  # flag bytes of each visible row as drawn
+        self._moving: List[pygame.Rect] = []  # head/tail rects drawn last frame
+        self._hud: List[HudText] = []
+        self._hud_blits: List[Tuple[pygame.Surface, pygame.Rect]] = []
+        self.background: Optional[pygame.Surface] = None
+        self.background_bakes = 0
+        self._background_key = None
+        self._background_origin = (0, 0)  # board cell at its top-left
+
+    def invalidate(self):
+        """Force the next frame to repaint the whole window."""
+        self.full_repaint = True
+
+    def set_cell_borders(self, enabled: bool):
+        """Switch grid lines, board border and sprite outlines on or off."""
+        if enabled != self.cell_borders:
+            self.cell_borders = enabled
+            self.atlas = CellAtlas(self.cell_size, enabled)
+            self.invalidate()
+
+    def render_text(self, text: str, color, size: int = 36) -> pygame.Surface:
+        return self.text_cache.render(get_font(size), text, color)
+
+    def _render_hud(
+        self, hud: List[HudText]
+    ) -> List[Tuple[pygame.Surface, pygame.Rect]]:
+        blits = []
+        for item in hud:
+            surf = self.render_text(item.text, item.color, item.size)
+            rect = surf.get_rect()
+            if item.right:
+                rect.topright = item.pos
+            else:
+                rect.topleft = item.pos
+            blits.append((surf, rect))
+        return blits
+
+    def _bake_background(self, view) -> bool:
+        """Draw obstacles, grid lines and border for the board or the view.
+
+        Returns True if the layer was rebuilt.
+        """
+        engine = self.engine
+        cell = self.cell_size
+        if engine.cols * engine.rows * cell * cell <= MAX_BACKGROUND_PIXELS:
+            x0, y0, x1, y1 = 0, 0, engine.cols, engine.rows
+            key = (engine.obstacles_version, cell, self.cell_borders)
+        else:
+            x0, y0, x1, y1 = view[:4]
+            key = (engine.obstacles_version, cell, self.cell_borders, x0, y0, x1, y1)
+        if key == self._background_key:
+            return False
+
+        surf = pygame.Surface(((x1 - x0) * cell, (y1 - y0) * cell))
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert()
+        surf.fill(BACKGROUND_COLOR)
+        width, height = surf.get_size()
+        if self.cell_borders:
+            for x in range(0, width, cell):
+                pygame.draw.line(surf, GRID_COLOR, (x, 0), (x, height - 1))
+            for y in range(0, height, cell):
+                pygame.draw.line(surf, GRID_COLOR, (0, y), (width - 1, y))
+        for ox, oy in engine.obstacles:
+            if x0 <= ox < x1 and y0 <= oy < y1:
+                rect = ((ox - x0) * cell, (oy - y0) * cell, cell, cell)
+                pygame.draw.rect(surf, OBSTACLE_COLOR, rect)
+        whole = x0 == 0 and y0 == 0 and x1 == engine.cols and y1 == engine.rows
+        if self.cell_borders and whole:
+            pygame.draw.rect(surf, BORDER_COLOR, surf.get_rect(), 1)
+
+        self.background = surf
+        self._background_key = key
+        self._background_origin = (x0, y0)
+        self.background_bakes += 1
+        return True
+
+    def _restore_background(self, rect: pygame.Rect):
+        """Repaint a screen rectangle from the background layer."""
+        bx, by = self.camera.to_screen(*self._background_origin)
+        area = rect.move(-bx, -by)
+        if not self.background.get_rect().contains(area):
+            self.screen.fill(BACKGROUND_COLOR, rect)
+        self.screen.blit(self.background, rect, area)
+
+    def _cell_rect(self, x: int, y: int) -> pygame.Rect:
+        return pygame.Rect(*self.camera.to_screen(x, y), self.cell_size, self.cell_size)
+
+    def _cells_under(self, rect: pygame.Rect, view) -> Set[Tuple[int, int]]:
+        """Visible cells overlapping a screen rectangle."""
+        x0, y0, x1, y1 = view[:4]
+        cell = self.cell_size
+        left = int((rect.left + self.camera.x) // cell)
+        top = int((rect.top + self.camera.y) // cell)
+        right = int((rect.right - 1 + self.camera.x) // cell)
+        bottom = int((rect.bottom - 1 + self.camera.y) // cell)
+        return {
+            (x, y)
+            for y in range(max(top, y0), min(bottom, y1 - 1) + 1)
+            for x in range(max(left, x0), min(right, x1 - 1) + 1)
+        }
+
+    def draw(
+        self,
+        head_pos: Tuple[float, float],
+        tail_pos: Optional[Tuple[float, float]],
+        hud: List[HudText],
+    ):
+        """Draw one frame and present it.
+
+        ``head_pos`` and ``tail_pos`` are the interpolated (fractional cell)
+        positions of the head and of the tail leaving its cell, or None
+        when the tail is not moving.
+        """
+        camera = self.camera
+        camera.follow(*head_pos)
+        view = (*camera.visible_range(), round(camera.x), round(camera.y))
+        baked = self._bake_background(view)
+        if baked or self.full_repaint or view != self._view:
+            self._draw_full(view, head_pos, tail_pos, hud)
+        else:
+            self._draw_dirty(view, head_pos, tail_pos, hud)
+
+    def _moving_rects(self, head_pos, tail_pos) -> List[pygame.Rect]:
+        cell = self.cell_size
+        rects = [pygame.Rect(*self.camera.to_screen(*head_pos), cell, cell)]
+        if tail_pos is not None:
+            rects.append(pygame.Rect(*self.camera.to_screen(*tail_pos), cell, cell))
+        return rects
+
+    def _cell_blits(self, x0, y0, x1, y1, head_pos, tail_pos) -> list:
+        """(sprite, position) pairs for every visible cell, head/tail last.
+
+        The head's own cell is left out: it is drawn interpolated instead.
+        """
+        camera = self.camera
+        cell = self.cell_size
+        engine = self.engine
+        cols = engine.cols
+        sprites = self.atlas.by_flags
+        xs = [round(x * cell - camera.x) for x in range(x0, x1)]
+        ys = [round(y * cell - camera.y) for y in range(y0, y1)]
+        head = engine.snake.head_index
+
+        seq = []
+        append = seq.append
+        for x, y, f in visible_cells(engine.grid, x0, y0, x1, y1):
+            sprite = sprites[f]
+            if sprite is not None and y * cols + x != head:
+                append((sprite, (xs[x - x0], ys[y - y0])))
+        snake = self.atlas.snake
+        for rect in self._moving_rects(head_pos, tail_pos):
+            append((snake, rect.topleft))
+        return seq
+
+    def _draw_full(self, view, head_pos, tail_pos, hud: List[HudText]):
+        screen = self.screen
+        grid = self.engine.grid
+        x0, y0, x1, y1 = view[:4]
+        screen.fill(BACKGROUND_COLOR)
+        screen.blit(self.background, self.camera.to_screen(*self._background_origin))
+
+        blit_all(screen, self._cell_blits(x0, y0, x1, y1, head_pos, tail_pos))
+        self._moving = self._moving_rects(head_pos, tail_pos)
+
+        self._hud = list(hud)
+        self._hud_blits = self._render_hud(hud)
+        screen.blits(self._hud_blits, doreturn=False)
+        pygame.display.flip()
+
+        cols = grid.cols
+        self._rows = [
+            bytes(grid.flags[y * cols + x0 : y * cols + x1]) for y in range(y0, y1)
+        ]
+        self._view = view
+        self.full_repaint = False
+        self.full_repaints += 1
+        self.dirty_rect_count = 1
+
+    def _draw_dirty(self, view, head_pos, tail_pos, hud: List[HudText]):
+        screen = self.screen
+        grid = self.engine.grid
+        flags = grid.flags
+        cols = grid.cols
+        x0, y0, x1, y1 = view[:4]
+        width = x1 - x0
+
+        # Cells whose grid flags changed since they were last drawn
+        dirty: Set[Tuple[int, int]] = set()
+        rows = self._rows
+        for r, y in enumerate(range(y0, y1)):
+            start = y * cols + x0
+            row = flags[start : start + width]
+            old = rows[r]
+            if row != old:
+                for dx in range(width):
+                    if row[dx] != old[dx]:
+                        dirty.add((x0 + dx, y))
+                rows[r] = bytes(row)
+
+        # Cells under last frame's and this frame's interpolated head/tail
+        moving = self._moving_rects(head_pos, tail_pos)
+        for rect in self._moving + moving:
+            dirty |= self._cells_under(rect, view)
+
+        # HUD text is redrawn when it changes or the board under it does
+        hud_changed = hud != self._hud
+        if hud_changed:
+            new_blits = self._render_hud(hud)
+        else:
+            new_blits = self._hud_blits
+        hud_rects = [rect for _, rect in self._hud_blits + new_blits]
+        redraw_hud = hud_changed or any(
+            self._cell_rect(x, y).collidelist(hud_rects) >= 0 for x, y in dirty
+        )
+        if redraw_hud:
+            for rect in hud_rects:
+                self._restore_background(rect)
+                dirty |= self._cells_under(rect, view)
+
+        head_index = self.engine.snake.head_index
+        sprites = self.atlas.by_flags
+        background = self.background
+        bx, by = self.camera.to_screen(*self._background_origin)
+        restores = []
+        seq = []
+        updates = []
+        for x, y in dirty:
+            rect = self._cell_rect(x, y)
+            restores.append((background, rect, rect.move(-bx, -by)))
+            i = y * cols + x
+            sprite = sprites[flags[i]]
+            if sprite is not None and i != head_index:
+                seq.append((sprite, rect.topleft))
+            updates.append(rect)
+        for rect in moving:
+            seq.append((self.atlas.snake, rect.topleft))
+            updates.append(rect)
+        screen.blits(restores, doreturn=False)
+        blit_all(screen, seq)
+        if redraw_hud:
+            screen.blits(new_blits, doreturn=False)
+            updates.extend(hud_rects)
+
+        pygame.display.update(updates)
+        self._moving = moving
+        self._hud = list(hud)
+        self._hud_blits = new_blits
+        self.dirty_rect_count = len(updates)
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Compact Snake replays and a fast headless verifier.
+
+A replay is the engine seed plus the heading applied on every tick, packed
+at 2 bits per tick (codes index snake_engine.DIRECTIONS). Because
+SnakeEngine draws all randomness from its seeded RNG and the
+invincibility timer runs on tick time, replaying the headings reproduces
+the game exactly, so recorded crashes and high scores can be re-checked
+in bulk:
+
+    python snake_replay.py game1.snkr game2.snkr ...
+"""
+
+import logging
+import struct
+import sys
+import time
+from array import array
+from functools import lru_cache
+from typing import List, Tuple
+
+from snake_engine import DIRECTIONS, SnakeEngine
+from snake_grid import FOOD, POWER_UP, SNAKE
+
+logger = logging.getLogger(__name__)
+
+CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+# magic, version, cols, rows, seed, ticks, score, moves, game over
+HEADER = struct.Struct("<4sBHHQIIIB")
+MAGIC = b"SNKR"
+VERSION = 2  # v2: power-up spawns use a geometric countdown
+
+# Byte value -> the four codes packed in it, lowest bits first
+_UNPACK = [bytes((b & 3, b >> 2 & 3, b >> 4 & 3, b >> 6)) for b in range(256)]
+
+
+def pack_codes(codes: bytes) -> bytes:
+    """Pack direction codes (0-3) four to a byte."""
+    padded = bytes(codes) + bytes(-len(codes) % 4)
+    return bytes(
+        padded[i] | padded[i + 1] << 2 | padded[i + 2] << 4 | padded[i + 3] << 6
+        for i in range(0, len(padded), 4)
+    )
+
+
+def unpack_codes(data: bytes, count: int) -> bytes:
+    """Inverse of pack_codes(); ``count`` drops the padding."""
+    return b"".join([_UNPACK[b] for b in data])[:count]
+
+
+class Replay:
+    """Seed, board size and per-tick headings of one game, plus its result."""
+
+    def __init__(
+        self,
+        cols: int,
+        rows: int,
+        seed: int,
+        codes: bytes,
+        score: int = 0,
+        moves: int = 0,
+        game_over: bool = False,
+    ):
+        if not 0 <= seed < 1 << 64:
+            raise ValueError(f"Replay seed must fit in 64 bits: {seed}")
+        self.cols = cols
+        self.rows = rows
+        self.seed = seed
+        self.codes = bytes(codes)
+        self.score = score
+        self.moves = moves
+        self.game_over = game_over
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def to_bytes(self) -> bytes:
+        header = HEADER.pack(
+            MAGIC,
+            VERSION,
+            self.cols,
+            self.rows,
+            self.seed,
+            len(self.codes),
+            self.score,
+            self.moves,
+            self.game_over,
+        )
+        return header + pack_codes(self.codes)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        if len(data) < HEADER.size:
+            raise ValueError("Replay data is truncated")
+        fields = HEADER.unpack_from(data)
+        magic, version, cols, rows, seed, ticks, score, moves, over = fields
+        if magic != MAGIC:
+            raise ValueError("Not a Snake replay")
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        packed = data[HEADER.size :]
+        if len(packed) * 4 < ticks:
+            raise ValueError("Replay data is truncated")
+        codes = unpack_codes(packed, ticks)
+        return cls(cols, rows, seed, codes, score, moves, bool(over))
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    """Records the heading an engine applied on each step() call."""
+
+    def __init__(self, engine: SnakeEngine):
+        self.engine = engine
+        self.start()
+
+    def start(self):
+        """Begin a new recording; call after engine.reset()."""
+        self.seed = self.engine.seed
+        self.codes = bytearray()
+
+    def record_tick(self):
+        """Call once after every engine.step()."""
+        self.codes.append(CODES[self.engine.direction])
+
+    def finish(self) -> Replay:
+        engine = self.engine
+        return Replay(
+            engine.cols,
+            engine.rows,
+            self.seed,
+            self.codes,
+            engine.score,
+            engine.ticks,
+            engine.game_over,
+        )
+
+
+# Code pairs where the second would reverse the heading set by the first
+_REVERSALS = (b"\x00\x01", b"\x01\x00", b"\x02\x03", b"\x03\x02")
+
+
+def replay_headings(start: int, codes: bytes) -> bytes:
+    """The heading in effect on each tick, given the starting heading's code.
+
+    Codes that would reverse the heading are ignored, as in
+    SnakeEngine.turn(). ReplayRecorder records the heading after each
+    turn, so recorded replays never contain one and come back unchanged.
+    """
+    if not codes or (
+        codes[0] != start ^ 1 and not any(pair in codes for pair in _REVERSALS)
+    ):
+        return codes
+    headings = bytearray(codes)
+    heading = start
+    for t, code in enumerate(codes):
+        if code != heading ^ 1:
+            heading = code
+        headings[t] = heading
+    return bytes(headings)
+
+
+@lru_cache(maxsize=4)
+def neighbour_table(cols: int, rows: int) -> array:
+    """Flat index of the cell one step away, or -1 past a wall, at
+    ``heading * cols * rows + index`` for each DIRECTIONS code."""
+    cells = cols * rows
+    table = array("i", bytes(4 * 4 * cells))
+    for code, (dx, dy) in enumerate(DIRECTIONS):
+        base = code * cells
+        for y in range(rows):
+            ny = y + dy
+            for x in range(cols):
+                nx = x + dx
+                inside = 0 <= nx < cols and 0 <= ny < rows
+                table[base + y * cols + x] = ny * cols + nx if inside else -1
+    return table
+
+
+def run_replay(replay: Replay) -> SnakeEngine:
+    """Re-simulate a replay and return the engine in its final state.
+
+    Moves that neither eat nor hit a wall (the vast majority of ticks) are
+    applied inline on the engine's grid, body and free-cell index, in the
+    same order as SnakeEngine.step(), so the RNG stream and free-cell
+    layout stay identical. Anything else (walls, food, power-ups, fatal
+    collisions) is handed to step() itself.
+
+    The inline moves run in segments that end before the next power-up
+    spawn, before either end of the body ring buffer wraps and when
+    invincibility runs out, so the per-tick loops have no countdown,
+    wrap-around or timer checks.
+    """
+    engine = SnakeEngine(replay.cols, replay.rows, replay.seed)
+    cells = engine.cols * engine.rows
+    grid, body = engine.grid, engine.snake
+    flags, snake_count = grid.flags, grid.snake_count
+    free = grid.free
+    free_cells, free_pos = free.cells, free.pos
+    buf, capacity = body.buf, body.capacity
+    neighbours = neighbour_table(engine.cols, engine.rows)
+    not_snake = ~SNAKE & 0xFF
+    edible = FOOD | POWER_UP
+
+    headings = replay_headings(CODES[engine.direction], replay.codes)
+    pos, end = 0, len(headings)
+    heading = CODES[engine.direction]
+    while pos < end and not engine.game_over:
+        invincible = engine.invincible
+        if invincible and body.length == capacity:
+            # step() pops the tail first on a full body
+            heading = headings[pos]
+            engine.step(DIRECTIONS[heading])
+            pos += 1
+            continue
+
+        # Let the ring pointers run to capacity - 1 without wrapping
+        head_ptr, tail_ptr = body._head, body._tail
+        if head_ptr == capacity - 1:
+            head_ptr = -1
+        first_ptr = head_ptr
+        stop = min(
+            end,
+            pos + engine.power_up_countdown,
+            pos + capacity - 1 - head_ptr,
+            pos + capacity - tail_ptr,
+        )
+        if invincible:
+            dt_ms = 1000 // engine.tick_rate
+            stop = min(stop, pos - (-engine.power_up_timer // dt_ms))
+
+        # The free-cell index keeps its cells packed in cells[:count]; a
+        # discard moves the last one into the hole and an add appends.
+        # The last one is kept in ``last`` (its pos entry is kept up to
+        # date) and only written back to free_cells when the segment ends,
+        # so a plain move (discard the head's cell, add the tail's) is a
+        # swap through ``last``.
+        last_slot = free.count - 1
+        last = free_cells[last_slot]
+        i = buf[body._head]
+        if not invincible:
+            for heading in headings[pos:stop]:
+                i = neighbours[heading * cells + i]
+                if i < 0 or flags[i]:
+                    break
+
+                # Move the head into the empty cell i
+                head_ptr += 1
+                buf[head_ptr] = i
+                snake_count[i] = 1
+                flags[i] = SNAKE
+                slot = free_pos[i]
+                free_cells[slot] = last
+                free_pos[last] = slot
+                free_pos[i] = -1
+
+                # Pop the tail
+                tail = buf[tail_ptr]
+                tail_ptr += 1
+                if snake_count[tail] == 1 and flags[tail] == SNAKE:
+                    snake_count[tail] = 0
+                    flags[tail] = 0
+                    last = tail
+                    free_pos[tail] = last_slot
+                    continue
+                # Overlapped (after invincibility) or on another layer
+                left = snake_count[tail] - 1
+                snake_count[tail] = left
+                flag = flags[tail] if left else flags[tail] & not_snake
+                flags[tail] = flag
+                if flag:
+                    # The tail's cell stays occupied: one free cell fewer
+                    last_slot -= 1
+                    last = free_cells[last_slot]
+                else:
+                    last = tail
+                    free_pos[tail] = last_slot
+        else:
+            for heading in headings[pos:stop]:
+                i = neighbours[heading * cells + i]
+                if i < 0:
+                    break
+                flag = flags[i]
+                if flag & edible:
+                    break
+
+                # Move the head into cell i, through the body or obstacles
+                head_ptr += 1
+                buf[head_ptr] = i
+                snake_count[i] += 1
+                flags[i] = flag | SNAKE
+                if not flag:
+                    slot = free_pos[i]
+                    free_cells[slot] = last
+                    free_pos[last] = slot
+                    free_pos[i] = -1
+                    last_slot -= 1
+                    last = free_cells[last_slot]
+
+                # Pop the tail
+                tail = buf[tail_ptr]
+                tail_ptr += 1
+                left = snake_count[tail] - 1
+                snake_count[tail] = left
+                flag = flags[tail] if left else flags[tail] & not_snake
+                flags[tail] = flag
+                if not flag:
+                    if last_slot >= 0:
+                        free_cells[last_slot] = last
+                    last_slot += 1
+                    last = tail
+                    free_pos[tail] = last_slot
+
+        moved = head_ptr - first_ptr
+        if last_slot >= 0:
+            free_cells[last_slot] = last
+        free.count = last_slot + 1
+        body._head = head_ptr % capacity
+        body._tail = tail_ptr % capacity
+        engine.ticks += moved
+        engine.direction = DIRECTIONS[heading]
+        if invincible:
+            engine.power_up_timer -= moved * dt_ms
+            if engine.power_up_timer <= 0:
+                engine.invincible = False
+                engine.power_up_timer = 0
+        pos += moved
+        if moved == engine.power_up_countdown:
+            # Let the engine spawn the power-up and draw the next delay
+            engine.power_up_countdown = 1
+            engine.generate_power_up()
+            continue
+        engine.power_up_countdown -= moved
+        if pos == stop:
+            continue
+
+        # A tick the inline path does not handle
+        heading = headings[pos]
+        engine.step(DIRECTIONS[heading])
+        pos += 1
+    return engine
+
+
+def verify(replay: Replay) -> bool:
+    """Re-simulate a replay and check it reproduces the recorded result."""
+    engine = run_replay(replay)
+    recorded = (replay.score, replay.moves, replay.game_over)
+    actual = (engine.score, engine.ticks, engine.game_over)
+    if actual != recorded:
+        logger.warning(
+            "Replay mismatch (seed %s): recorded score/moves/over %s, got %s",
+            replay.seed,
+            recorded,
+            actual,
+        )
+        return False
+    return True
+
+
+def verify_files(paths: List[str]) -> Tuple[int, int]:
+    """Verify replay files, returning (passed, total ticks)."""
+    passed = ticks = 0
+    for path in paths:
+        try:
+            replay = Replay.load(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"{path}: {e}")
+            continue
+        ok = verify(replay)
+        passed += ok
+        ticks += len(replay)
+        print(f"{'OK' if ok else 'MISMATCH':8s} {path} score={replay.score}")
+    return passed, ticks
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    paths = sys.argv[1:]
+    if not paths:
+        print(f"usage: {sys.argv[0]} REPLAY...")
+        sys.exit(2)
+    start = time.perf_counter()
+    passed, ticks = verify_files(paths)
+    elapsed = time.perf_counter() - start
+    print(f"{passed}/{len(paths)} verified, {ticks} ticks in {elapsed:.2f}s")
+    sys.exit(0 if passed == len(paths) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+"""
+Multiprocess rollout farm for evaluating Snake bots.
+
+RolloutFarm runs one worker process per core, each playing headless
+SnakeEngine games with a bot back to back. Every tick becomes one
+TRAJECTORY_DTYPE record written straight into that worker's
+TrajectoryRing, a single-producer ring buffer in
+``multiprocessing.shared_memory``, so nothing is pickled back to the
+parent; collect() copies out whatever arrived since the last call.
+Workers also keep their counters (steps, episodes, scores, a heartbeat)
+in a shared stats table that stats() turns into per-worker throughput.
+
+poll() restarts workers that crashed or stopped sending heartbeats, and
+restart() replaces a worker on request: it is asked to stop after its
+current tick, killed only if it does not, and the new process carries on
+with the same ring and counters.
+"""
+
+import logging
+import multiprocessing
+import os
+import random
+import time
+from multiprocessing import shared_memory
+from typing import Callable, List, NamedTuple, Optional
+
+import numpy as np
+
+from snake_autopilot import Autopilot
+from snake_engine import DIRECTIONS, Direction, SnakeEngine
+from snake_hamilton import HamiltonianSolver
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("random", "autopilot", "hamilton")
+
+TRAJECTORY_DTYPE = np.dtype(
+    [
+        ("worker", np.int16),
+        ("action", np.int8),  # index into snake_engine.DIRECTIONS
+        ("reward", np.int8),  # +1 food, -1 death, 0 otherwise
+        ("done", np.bool_),
+        ("episode", np.int32),
+        ("tick", np.int32),
+        ("head", np.int32),  # flat head cell after the tick
+        ("score", np.int32),
+    ]
+)
+
+# Columns of the shared per-worker stats table
+STAT_FIELDS = (
+    "steps",
+    "episodes",  # finished
+    "claimed",  # episode ids handed out, including unfinished games
+    "score_total",
+    "best_score",
+    "started",  # when the current process started
+    "started_steps",  # steps at that time
+    "heartbeat",
+)
+(
+    _STEPS,
+    _EPISODES,
+    _CLAIMED,
+    _SCORE_TOTAL,
+    _BEST,
+    _STARTED,
+    _STARTED_STEPS,
+    _HEARTBEAT,
+) = range(len(STAT_FIELDS))
+
+_ROW_BYTES = len(STAT_FIELDS) * 8
+
+# Ticks between heartbeats and stop checks in a worker
+_CHECK_EVERY = 256
+
+
+class TrajectoryRing:
+    """Single-producer, single-consumer ring of trajectory records in
+    shared memory.
+
+    The header holds the total number of records ever written; the
+    producer writes a record before bumping it, and the consumer rereads
+    it after copying to discard anything overwritten meanwhile. Records
+    the consumer falls more than ``capacity`` behind on are dropped and
+    counted.
+    """
+
+    def __init__(self, capacity: int, shm: Optional[shared_memory.SharedMemory] = None):
+        self.capacity = capacity
+        size = 8 + capacity * TRAJECTORY_DTYPE.itemsize
+        self.shm = shm or shared_memory.SharedMemory(create=True, size=size)
+        self._written = np.ndarray(1, np.int64, self.shm.buf)
+        self.records = np.ndarray(capacity, TRAJECTORY_DTYPE, self.shm.buf, offset=8)
+        self.read = 0  # consumer side
+        self.dropped = 0
+
+    @property
+    def written(self) -> int:
+        return int(self._written[0])
+
+    def push(self, record: tuple):
+        """Producer side: append one record, overwriting the oldest."""
+        n = int(self._written[0])
+        self.records[n % self.capacity] = record
+        self._written[0] = n + 1
+
+    def pull(self) -> np.ndarray:
+        """Consumer side: copy of the records written since the last pull."""
+        end = self.written
+        start = max(self.read, end - self.capacity)
+        self.dropped += start - self.read
+        first, last = start % self.capacity, end % self.capacity
+        if end - start == 0:
+            out = self.records[:0].copy()
+        elif first < last:
+            out = self.records[first:last].copy()
+        else:
+            out = np.concatenate((self.records[first:], self.records[:last]))
+        # Whatever the producer lapped while we copied is no longer valid,
+        # including the slot of the record it may be writing right now
+        overwritten = min(len(out), self.written + 1 - self.capacity - start)
+        if overwritten > 0:
+            self.dropped += overwritten
+            out = out[overwritten:]
+        self.read = end
+        return out
+
+    @classmethod
+    def attach(cls, name: str, capacity: int) -> "TrajectoryRing":
+        """Open a ring created by another process."""
+        return cls(capacity, shared_memory.SharedMemory(name=name))
+
+    def close(self, unlink: bool = False):
+        del self._written, self.records
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class WorkerStats(NamedTuple):
+    """Counters for one worker slot, across its restarts."""
+
+    worker: int
+    alive: bool
+    restarts: int
+    steps: int
+    episodes: int
+    mean_score: float
+    best_score: int
+    steps_per_sec: float  # of the current process
+
+
+def make_policy(name: str, engine: SnakeEngine, seed: int) -> Callable[[], Direction]:
+    """Bot picking the heading for each tick of ``engine``."""
+    if name == "autopilot":
+        return Autopilot(engine).next_direction
+    if name == "hamilton":
+        return HamiltonianSolver(engine).next_direction
+    if name == "random":
+        rng = random.Random(seed)
+        return lambda: rng.choice(DIRECTIONS)
+    raise ValueError(f"Unknown policy {name!r}; expected one of {POLICIES}")
+
+
+def _play(
+    worker: int,
+    policy: str,
+    cols: int,
+    rows: int,
+    seed: int,
+    max_ticks: int,
+    ring_name: str,
+    ring_capacity: int,
+    stats_name: str,
+    stop,
+):
+    """Worker process body: play games until ``stop`` is set."""
+    ring = TrajectoryRing.attach(ring_name, ring_capacity)
+    stats_shm = shared_memory.SharedMemory(name=stats_name)
+    row = np.ndarray(len(STAT_FIELDS), np.float64, stats_shm.buf, worker * _ROW_BYTES)
+    try:
+        _play_games(worker, policy, cols, rows, seed, max_ticks, ring, row, stop)
+    finally:
+        del row
+        stats_shm.close()
+        ring.close()
+
+
+def _play_games(
+    worker: int,
+    policy: str,
+    cols: int,
+    rows: int,
+    seed: int,
+    max_ticks: int,
+    ring: TrajectoryRing,
+    row: np.ndarray,
+    stop,
+):
+    row[_STARTED_STEPS] = row[_STEPS]
+    row[_STARTED] = row[_HEARTBEAT] = time.time()
+    while not stop.is_set():
+        # Ids are claimed before the game starts and count across restarts,
+        # so a game cut short by a restart is never replayed under its id
+        # and seeds never repeat; such a game just has no done record
+        episode = int(row[_CLAIMED])
+        row[_CLAIMED] += 1
+        engine = SnakeEngine(cols, rows, seed=seed + episode)
+        bot = make_policy(policy, engine, seed + episode)
+        done = False
+        tick = 0
+        while not done:
+            direction = bot()
+            score = engine.score
+            over = engine.step(direction)
+            # engine.ticks does not count a fatal step, so count them here
+            tick += 1
+            reward = 1 if engine.score > score else -1 if over else 0
+            # Bots that circle forever are cut off after max_ticks
+            done = over or tick >= max_ticks
+            ring.push(
+                (
+                    worker,
+                    DIRECTIONS.index(engine.direction),
+                    reward,
+                    done,
+                    episode,
+                    tick,
+                    engine.snake.head_index,
+                    engine.score,
+                )
+            )
+            row[_STEPS] += 1
+            if tick % _CHECK_EVERY == 0:
+                row[_HEARTBEAT] = time.time()
+                if stop.is_set():
+                    break
+        else:
+            row[_EPISODES] += 1
+            row[_SCORE_TOTAL] += engine.score
+            row[_BEST] = max(row[_BEST], engine.score)
+    row[_HEARTBEAT] = time.time()
+
+
+class RolloutFarm:
+    """Pool of worker processes playing Snake games into shared memory."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        policy: str = "autopilot",
+        cols: int = 40,
+        rows: int = 30,
+        seed: int = 0,
+        ring_capacity: int = 1 << 16,
+        max_ticks: int = 100_000,
+        stall_s: float = 10.0,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}; expected one of {POLICIES}")
+        self.workers = workers or os.cpu_count() or 1
+        self.policy = policy
+        self.cols = cols
+        self.rows = rows
+        self.seed = seed
+        self.ring_capacity = ring_capacity
+        self.max_ticks = max_ticks
+        self.stall_s = stall_s
+        self.context = multiprocessing.get_context()
+
+        self.rings = [TrajectoryRing(ring_capacity) for _ in range(self.workers)]
+        size = self.workers * _ROW_BYTES
+        self._stats_shm = shared_memory.SharedMemory(create=True, size=size)
+        self.stats_table = np.ndarray(
+            (self.workers, len(STAT_FIELDS)), np.float64, self._stats_shm.buf
+        )
+        self.stats_table.fill(0.0)
+        self.processes: List[Optional[multiprocessing.Process]] = [None] * self.workers
+        self._stops: List = [None] * self.workers
+        self.restarts = [0] * self.workers
+
+    def __enter__(self) -> "RolloutFarm":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        for worker in range(self.workers):
+            self._spawn(worker)
+
+    def _spawn(self, worker: int):
+        stop = self.context.Event()
+        self._stops[worker] = stop
+        # Grace period until the new process sends its own heartbeat
+        self.stats_table[worker, _HEARTBEAT] = time.time()
+        process = self.context.Process(
+            target=_play,
+            args=(
+                worker,
+                self.policy,
+                self.cols,
+                self.rows,
+                # Disjoint seed ranges per worker slot
+                self.seed + worker * 1_000_000_000,
+                self.max_ticks,
+                self.rings[worker].shm.name,
+                self.ring_capacity,
+                self._stats_shm.name,
+                stop,
+            ),
+            name=f"snake-rollout-{worker}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[worker] = process
+
+    def _stop(self, worker: int, timeout: float):
+        """Ask a worker to finish its tick and exit; kill it if it won't."""
+        process = self.processes[worker]
+        if process is None:
+            return
+        self._stops[worker].set()
+        process.join(timeout)
+        if process.is_alive():
+            logger.warning(f"Worker {worker} did not stop in {timeout} s, killing it")
+            process.kill()
+            process.join()
+        self.processes[worker] = None
+
+    def restart(self, worker: int, timeout: float = 5.0):
+        """Replace a worker with a fresh process on the same ring."""
+        self._stop(worker, timeout)
+        self.restarts[worker] += 1
+        self._spawn(worker)
+
+    def poll(self) -> List[int]:
+        """Restart workers that died or whose heartbeat went stale.
+
+        Returns the restarted worker slots.
+        """
+        now = time.time()
+        restarted = []
+        for worker, process in enumerate(self.processes):
+            if process is None:
+                continue
+            heartbeat = self.stats_table[worker, _HEARTBEAT]
+            if not process.is_alive():
+                code = process.exitcode
+                logger.warning(f"Worker {worker} exited ({code}), restarting")
+            elif heartbeat and now - heartbeat > self.stall_s:
+                logger.warning(f"Worker {worker} stalled for {now - heartbeat:.0f} s")
+            else:
+                continue
+            self.restart(worker)
+            restarted.append(worker)
+        return restarted
+
+    def collect(self) -> np.ndarray:
+        """Trajectory records from every worker since the last call."""
+        return np.concatenate([ring.pull() for ring in self.rings])
+
+    @property
+    def dropped(self) -> int:
+        """Records overwritten before collect() picked them up."""
+        return sum(ring.dropped for ring in self.rings)
+
+    def stats(self) -> List[WorkerStats]:
+        now = time.time()
+        out = []
+        for worker, row in enumerate(self.stats_table):
+            process = self.processes[worker]
+            episodes = int(row[_EPISODES])
+            elapsed = now - float(row[_STARTED]) if row[_STARTED] else 0.0
+            run_steps = float(row[_STEPS] - row[_STARTED_STEPS])
+            out.append(
+                WorkerStats(
+                    worker,
+                    process is not None and process.is_alive(),
+                    self.restarts[worker],
+                    int(row[_STEPS]),
+                    episodes,
+                    float(row[_SCORE_TOTAL]) / episodes if episodes else 0.0,
+                    int(row[_BEST]),
+                    run_steps / elapsed if elapsed > 0 else 0.0,
+                )
+            )
+        return out
+
+    def close(self, timeout: float = 5.0):
+        """Stop every worker and release the shared memory."""
+        for worker in range(self.workers):
+            self._stop(worker, timeout)
+        for ring in self.rings:
+            ring.close(unlink=True)
+        del self.stats_table
+        self._stats_shm.close()
+        self._stats_shm.unlink()
+
+    def summary(self) -> str:
+        stats = self.stats()
+        rate = sum(s.steps_per_sec for s in stats if s.alive)
+        return (
+            f"{self.workers} workers  {rate:,.0f} steps/s  "
+            f"steps {sum(s.steps for s in stats)} "
+            f"episodes {sum(s.episodes for s in stats)} "
+            f"restarts {sum(self.restarts)} dropped {self.dropped}"
+        )
@@ -0,0 +1,75 @@
+"""
+Viewport helpers for drawing boards larger than the window.
+
+Camera keeps the snake's head centred (clamped to the board edges) and
+reports which cells are on screen; visible_cells() then walks only those
+cells of the OccupancyGrid, so draw cost depends on the window size and
+not on board size or snake length.
+"""
+
+import math
+from typing import Iterator, Tuple
+
+from snake_grid import OccupancyGrid
+
+
+class Camera:
+    """Pixel offset of the window over the board, following a target."""
+
+    def __init__(
+        self, view_w: int, view_h: int, cell_size: int, cols: int, rows: int
+    ):
+        self.view_w = view_w
+        self.view_h = view_h
+        self.cell_size = cell_size
+        self.max_x = max(0, cols * cell_size - view_w)
+        self.max_y = max(0, rows * cell_size - view_h)
+        self.cols = cols
+        self.rows = rows
+        self.x = 0.0
+        self.y = 0.0
+
+    def follow(self, cell_x: float, cell_y: float):
+        """Centre on a (possibly fractional) cell position."""
+        half = self.cell_size / 2
+        x = cell_x * self.cell_size + half - self.view_w / 2
+        y = cell_y * self.cell_size + half - self.view_h / 2
+        self.x = min(max(x, 0.0), self.max_x)
+        self.y = min(max(y, 0.0), self.max_y)
+
+    def visible_range(self) -> Tuple[int, int, int, int]:
+        """Cells on screen as (x0, y0, x1, y1), end-exclusive."""
+        cell = self.cell_size
+        x0 = int(self.x // cell)
+        y0 = int(self.y // cell)
+        x1 = min(self.cols, math.ceil((self.x + self.view_w) / cell))
+        y1 = min(self.rows, math.ceil((self.y + self.view_h) / cell))
+        return x0, y0, x1, y1
+
+    def to_screen(self, cell_x: float, cell_y: float) -> Tuple[int, int]:
+        """Top-left pixel of a cell in window coordinates."""
+        return (
+            round(cell_x * self.cell_size - self.x),
+            round(cell_y * self.cell_size - self.y),
+        )
+
+
+def visible_cells(
+    grid: OccupancyGrid, x0: int, y0: int, x1: int, y1: int
+) -> Iterator[Tuple[int, int, int]]:
+    """Yield (x, y, flags) for every occupied cell in the given range.
+
+    Each on-screen row is sliced out of the flag bytes and skipped at C
+    speed when empty, so only occupied on-screen cells reach Python.
+    """
+    flags = grid.flags
+    cols = grid.cols
+    width = x1 - x0
+    for y in range(y0, y1):
+        start = y * cols + x0
+        row = flags[start : start + width]
+        if row.count(0) == width:
+            continue
+        for dx, f in enumerate(row):
+            if f:
+                yield x0 + dx, y, f
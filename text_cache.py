@@ -0,0 +1,74 @@
+"""
+Font registry and rendered-text cache for the pygame frontends.
+
+pygame.font.SysFont() can scan the system font list, and Font.render()
+rasterizes the string every call. get_font() builds each (name, size)
+font once per process, and TextCache keeps the most recently used text
+surfaces so HUD strings are rasterized only when their value changes.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+Color = Tuple[int, int, int]
+
+_fonts: Dict[Tuple[Optional[str], int], pygame.font.Font] = {}
+
+
+def get_font(size: int, name: Optional[str] = None) -> pygame.font.Font:
+    """Shared SysFont for ``name`` (None for the default font) at ``size``."""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        if not _fonts:
+            # Fonts do not survive pygame.quit(); quit hooks run only once,
+            # so re-register for each init/quit cycle
+            pygame.register_quit(_fonts.clear)
+        font = _fonts[key] = pygame.font.SysFont(name, size)
+    return font
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, color)."""
+
+    def __init__(self, capacity: int = 128):
+        self.capacity = capacity
+        self._surfaces: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def render(
+        self, font: pygame.font.Font, text: str, color: Color, antialias: bool = True
+    ) -> pygame.Surface:
+        """Rendered surface for ``text``; treat it as read-only, it is shared."""
+        key = (font, text, color, antialias)
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = font.render(text, antialias, color)
+        self._surfaces[key] = surf
+        if len(self._surfaces) > self.capacity:
+            self._surfaces.popitem(last=False)
+        return surf
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def summary(self) -> str:
+        return (
+            f"text cache {self.hit_rate:.0%} hits "
+            f"({len(self._surfaces)}/{self.capacity} surfaces)"
+        )
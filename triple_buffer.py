@@ -0,0 +1,45 @@
+"""
+Lock-light latest-value exchange between one writer and one reader thread.
+
+The writer publishes into a back slot and swaps it with the ready slot;
+the reader swaps the ready slot into its front slot when something new
+arrived. Neither side ever waits for the other to finish a frame, and the
+reader always sees the newest complete value. Values are meant to be
+immutable (e.g. SnakeState snapshots), so slots only hold references.
+"""
+
+import threading
+from typing import Generic, List, TypeVar
+
+T = TypeVar("T")
+
+
+class TripleBuffer(Generic[T]):
+    """Three-slot buffer handing the newest published value to a reader."""
+
+    def __init__(self, initial: T):
+        self._slots: List[T] = [initial, initial, initial]
+        self._back = 0  # writer's slot
+        self._ready = 1  # newest published value
+        self._front = 2  # reader's slot
+        self._fresh = False
+        self._lock = threading.Lock()
+        self.published = 0
+        self.read = 0  # publishes the reader actually picked up
+
+    def publish(self, value: T):
+        """Writer side: make ``value`` the newest one."""
+        self._slots[self._back] = value
+        with self._lock:
+            self._back, self._ready = self._ready, self._back
+            self._fresh = True
+            self.published += 1
+
+    def latest(self) -> T:
+        """Reader side: the newest published value (or the last one read)."""
+        with self._lock:
+            if self._fresh:
+                self._front, self._ready = self._ready, self._front
+                self._fresh = False
+                self.read += 1
+        return self._slots[self._front]